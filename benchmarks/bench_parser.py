@@ -0,0 +1,132 @@
+"""
+Compares the single-pass block parser in formatter.py (streaming and mmap modes) with the
+original per-label rescan on synthetic TXT exports.
+
+    python benchmarks/bench_parser.py                 # 10k, 100k and 1M blocks
+    python benchmarks/bench_parser.py --sizes 10000   # just one size
+"""
+
+import argparse
+import os
+import re
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from formatter import LABELS, iter_trades_mmap, parse_trade_file  # noqa: E402
+
+BLOCK = """Buy SPY ${strike} Call 7/31
+$94.00
+2 contracts at $0.47
+Individual · Jul 28
+Type
+Limit buy
+Position effect
+Open
+Time in force
+Good for day
+Submitted
+7/28/2025, 9:31:05 AM EDT
+Quantity
+2
+Account
+Individual
+Status
+Filled
+Filled quantity
+2 contracts
+Filled
+7/28/2025, 9:31:07 AM EDT
+Limit price
+$0.47
+Est cost
+$94.00
+Est regulatory fees
+$0.06
+"""
+
+
+def legacy_parse_trade_file(path):
+    """
+    The original parser: reads the whole file, splits it with a regex and rescans each block
+    once per label.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        raw_text = f.read()
+
+    trade_blocks = re.split(r'\n\s*\n+', raw_text.strip())
+
+    all_trades = []
+    for block in trade_blocks:
+        raw_lines = [line.strip() for line in block.splitlines()]
+        lines = [line for line in raw_lines if line]
+        lines = [line for line in lines if "·" not in line]
+        if len(lines) < 3:
+            continue
+
+        parsed = {
+            "header": lines[0],
+            "Total Cost": lines[1],
+            "Quantity + Price": lines[2],
+        }
+        idx = 3
+        for label in LABELS:
+            while idx < len(lines) and lines[idx] != label:
+                idx += 1
+            if idx < len(lines) and lines[idx] == label and (idx + 1) < len(lines):
+                parsed[label] = lines[idx + 1]
+                idx += 2
+            else:
+                idx += 1
+
+        all_trades.append(parsed)
+
+    return all_trades
+
+
+def write_synthetic_file(path, blocks):
+    with open(path, 'w', encoding='utf-8') as f:
+        for i in range(blocks):
+            f.write(BLOCK.format(strike=600 + i % 100))
+            f.write("\n")
+
+
+def time_call(fn, path):
+    start = time.perf_counter()
+    result = fn(path)
+    return time.perf_counter() - start, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000],
+        help="number of trade blocks per synthetic file"
+    )
+    args = parser.parse_args(argv)
+
+    print(f"{'blocks':>10} {'MB':>8} {'legacy s':>10} {'single-pass s':>14} {'speedup':>8} {'mmap s':>8} {'speedup':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for blocks in args.sizes:
+            path = os.path.join(tmp, f"trades_{blocks}.txt")
+            write_synthetic_file(path, blocks)
+            size_mb = os.path.getsize(path) / 1e6
+
+            legacy_s, legacy = time_call(legacy_parse_trade_file, path)
+            new_s, new = time_call(parse_trade_file, path)
+            mmap_s, mapped = time_call(lambda p: list(iter_trades_mmap(p)), path)
+            if new != legacy or mapped != legacy:
+                raise SystemExit(f"Parsers disagree on the {blocks}-block file")
+            del legacy, new, mapped
+
+            print(
+                f"{blocks:>10} {size_mb:>8.1f} {legacy_s:>10.2f} {new_s:>14.2f} {legacy_s / new_s:>7.2f}x"
+                f" {mmap_s:>8.2f} {legacy_s / mmap_s:>7.2f}x"
+            )
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,612 @@
+import os
+import sqlite3
+import threading
+from collections import namedtuple
+from contextlib import contextmanager
+from datetime import datetime
+from itertools import islice
+from pathlib import Path
+from typing import Iterable
+
+from normalize import TYPED_COLUMNS, normalize_record
+
+# ─── CONSTANTS ─────────────────────────────────────────────────────────────────
+
+DB_PATH = Path("trades.db")   # SQLite file in the same folder as app.py
+
+# Text columns a trade record carries, in table order (id and the typed columns are added
+# by the database layer)
+RECORD_COLUMNS = [
+    "header", "total_cost", "quantity_price", "type", "position_effect",
+    "time_in_force", "submitted", "quantity", "account", "status",
+    "filled_quantity", "filled", "limit_price", "est_cost", "est_reg_fees",
+    "suggestion", "comment", "saved_at",
+]
+
+_INSERT_COLUMNS = RECORD_COLUMNS + list(TYPED_COLUMNS)
+# Rows whose fingerprint is already in the table are skipped (see migration 4)
+_INSERT_SQL = (
+    f"INSERT OR IGNORE INTO trades ({', '.join(_INSERT_COLUMNS)}) "
+    f"VALUES ({', '.join(':' + col for col in _INSERT_COLUMNS)})"
+)
+
+DEFAULT_BATCH_SIZE = 1000
+
+# Outcome of an insert: rows written and rows skipped as duplicates of existing trades
+InsertResult = namedtuple("InsertResult", ["inserted", "skipped"])
+DEFAULT_PAGE_SIZE = 100
+# Rows pulled from the cursor per fetchmany() call by fetch_trade_columns
+DEFAULT_FETCH_CHUNK = 500
+
+# search_trades: relevance weights of header, suggestion and comment (notes count double),
+# the highlight markers put around matched terms, and the default number of hits
+SEARCH_WEIGHTS = (1.0, 2.0, 2.0)
+HIGHLIGHT_START, HIGHLIGHT_END = "\x02", "\x03"
+DEFAULT_SEARCH_LIMIT = 50
+
+# Columns fetch_trades accepts as equality filters
+FILTER_COLUMNS = set(RECORD_COLUMNS) | set(TYPED_COLUMNS)
+
+# Schema upgrades, applied in order. PRAGMA user_version records how many have run, so each
+# entry runs exactly once per database; append new entries, never edit old ones.
+_MIGRATIONS = [
+    # 1: newest-first keyset pagination in fetch_trades
+    [
+        "CREATE INDEX IF NOT EXISTS idx_trades_saved_at_id ON trades (saved_at DESC, id DESC)",
+    ],
+    # 2: dashboard filters; each leads with the filter column and keeps the page order so
+    #    a filtered page is still one index range scan
+    [
+        "CREATE INDEX IF NOT EXISTS idx_trades_account ON trades (account, saved_at DESC, id DESC)",
+        "CREATE INDEX IF NOT EXISTS idx_trades_status ON trades (status, saved_at DESC, id DESC)",
+        "CREATE INDEX IF NOT EXISTS idx_trades_underlying ON trades (underlying, saved_at DESC, id DESC)",
+        "CREATE INDEX IF NOT EXISTS idx_trades_submitted_ts ON trades (submitted_ts)",
+    ],
+    # 3: data version counter for cache invalidation (see get_data_version)
+    [
+        "CREATE TABLE IF NOT EXISTS journal_meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)",
+        "INSERT OR IGNORE INTO journal_meta (key, value) VALUES ('data_version', 0)",
+    ],
+    # 4: one row per trade fingerprint. Rows already duplicated keep their data but only
+    #    the oldest copy keeps the fingerprint (NULLs don't collide in a UNIQUE index)
+    [
+        "UPDATE trades SET fingerprint = NULL WHERE id NOT IN "
+        "(SELECT MIN(id) FROM trades WHERE fingerprint IS NOT NULL GROUP BY fingerprint)",
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_trades_fingerprint ON trades (fingerprint)",
+    ],
+    # 5: byte-offset checkpoints for follow mode (see get_checkpoint)
+    [
+        "CREATE TABLE IF NOT EXISTS ingest_checkpoints ("
+        "path TEXT PRIMARY KEY, file_id TEXT, byte_offset INTEGER NOT NULL, updated_at TEXT)",
+    ],
+    # 6: manifest of files the directory watcher has imported (see record_imports)
+    [
+        "CREATE TABLE IF NOT EXISTS import_manifest ("
+        "sha256 TEXT PRIMARY KEY, path TEXT, size INTEGER, mtime_ns INTEGER, "
+        "parsed INTEGER, imported_at TEXT)",
+        "CREATE INDEX IF NOT EXISTS idx_import_manifest_path ON import_manifest (path, size, mtime_ns)",
+    ],
+    # 7: full-text index over header, suggestion and comment (see search_trades). An
+    #    external-content FTS5 table: it stores only the index, kept in step by triggers
+    [
+        "CREATE VIRTUAL TABLE IF NOT EXISTS trades_fts USING fts5("
+        "header, suggestion, comment, content='trades', content_rowid='id', "
+        "tokenize='unicode61 remove_diacritics 2')",
+        "CREATE TRIGGER IF NOT EXISTS trades_fts_insert AFTER INSERT ON trades BEGIN "
+        "INSERT INTO trades_fts (rowid, header, suggestion, comment) "
+        "VALUES (new.id, new.header, new.suggestion, new.comment); END",
+        "CREATE TRIGGER IF NOT EXISTS trades_fts_delete AFTER DELETE ON trades BEGIN "
+        "INSERT INTO trades_fts (trades_fts, rowid, header, suggestion, comment) "
+        "VALUES ('delete', old.id, old.header, old.suggestion, old.comment); END",
+        "CREATE TRIGGER IF NOT EXISTS trades_fts_update AFTER UPDATE OF header, suggestion, comment "
+        "ON trades BEGIN "
+        "INSERT INTO trades_fts (trades_fts, rowid, header, suggestion, comment) "
+        "VALUES ('delete', old.id, old.header, old.suggestion, old.comment); "
+        "INSERT INTO trades_fts (rowid, header, suggestion, comment) "
+        "VALUES (new.id, new.header, new.suggestion, new.comment); END",
+        # Index the trades saved before this migration
+        "INSERT INTO trades_fts (trades_fts) VALUES ('rebuild')",
+    ],
+    # 8: decoded option headers: per-expiry and per-contract lookups
+    [
+        "CREATE INDEX IF NOT EXISTS idx_trades_expiry ON trades (expiry, underlying)",
+        "CREATE INDEX IF NOT EXISTS idx_trades_contract "
+        "ON trades (underlying, expiry, strike_cents, option_right, side)",
+    ],
+    # 9: files the directory watcher failed to parse, kept so they aren't retried unchanged
+    [
+        "ALTER TABLE import_manifest ADD COLUMN error TEXT",
+    ],
+]
+SCHEMA_VERSION = len(_MIGRATIONS)
+
+# Connection tuning applied once per new connection
+_PRAGMAS = [
+    "PRAGMA journal_mode=WAL",        # readers don't block the writer and vice versa
+    "PRAGMA synchronous=NORMAL",      # safe with WAL, fsyncs only at checkpoints
+    "PRAGMA cache_size=-65536",       # 64 MiB page cache
+    "PRAGMA mmap_size=268435456",     # map up to 256 MiB of the file
+    "PRAGMA temp_store=MEMORY",
+]
+BUSY_TIMEOUT_S = 10
+
+# ─── CONNECTION MANAGER ────────────────────────────────────────────────────────
+
+# Idle connections per (pid, DB_PATH); a forked process never reuses its parent's
+_pool_lock = threading.Lock()
+_idle_connections = {}
+POOL_SIZE = 8
+
+
+def _open_connection():
+    conn = sqlite3.connect(DB_PATH, timeout=BUSY_TIMEOUT_S, check_same_thread=False)
+    for pragma in _PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+
+@contextmanager
+def connection():
+    """
+    Check a tuned connection to DB_PATH out of the process-wide pool for the duration of a
+    `with` block, opening one only when none is idle.
+
+    The pool is shared by every thread, so Streamlit reruns (each on a fresh script thread)
+    reuse the same few connections instead of reconnecting and re-running the PRAGMAs. A
+    connection is used by one thread at a time; concurrent sessions get their own, and WAL
+    lets them read while another thread or process (e.g. an import) writes. Up to
+    POOL_SIZE idle connections are kept.
+    """
+    key = (os.getpid(), str(DB_PATH))
+    with _pool_lock:
+        idle = _idle_connections.setdefault(key, [])
+        conn = idle.pop() if idle else None
+    if conn is None:
+        conn = _open_connection()
+
+    try:
+        yield conn
+    finally:
+        # Never hand a half-finished transaction to the next borrower
+        if conn.in_transaction:
+            conn.rollback()
+        with _pool_lock:
+            idle = _idle_connections.setdefault(key, [])
+            if len(idle) < POOL_SIZE:
+                idle.append(conn)
+                conn = None
+        if conn is not None:
+            conn.close()
+
+# ─── DATABASE SETUP ────────────────────────────────────────────────────────────
+
+def init_db():
+    """
+    Create the trades table if it doesn’t already exist.
+    """
+    with connection() as conn:
+        c = conn.cursor()
+        c.execute(
+            """
+            CREATE TABLE IF NOT EXISTS trades (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                header TEXT,
+                total_cost TEXT,
+                quantity_price TEXT,
+                type TEXT,
+                position_effect TEXT,
+                time_in_force TEXT,
+                submitted TEXT,
+                quantity TEXT,
+                account TEXT,
+                status TEXT,
+                filled_quantity TEXT,
+                filled TEXT,
+                limit_price TEXT,
+                est_cost TEXT,
+                est_reg_fees TEXT,
+                suggestion TEXT,
+                comment TEXT,
+                saved_at TEXT
+            )
+            """
+        )
+
+        # Typed columns were added after the first release; add any that are missing and fill
+        # them in for rows saved before they existed
+        existing = {row[1] for row in c.execute("PRAGMA table_info(trades)")}
+        missing = [col for col in TYPED_COLUMNS if col not in existing]
+        for col in missing:
+            c.execute(f"ALTER TABLE trades ADD COLUMN {col} {TYPED_COLUMNS[col]}")
+        if missing:
+            # Only the new columns: recomputing existing ones could resurrect the fingerprints
+            # that migration 4 cleared on duplicate rows
+            assignments = ", ".join(f"{col} = :{col}" for col in missing)
+            update_sql = f"UPDATE trades SET {assignments} WHERE id = :id"
+            # Streamed in chunks on a second cursor, so a large journal is never held in memory
+            reader = conn.execute("SELECT * FROM trades ORDER BY id")
+            colnames = [desc[0] for desc in reader.description]
+            while True:
+                rows = reader.fetchmany(DEFAULT_BATCH_SIZE)
+                if not rows:
+                    break
+                updates = []
+                for row in rows:
+                    record = dict(zip(colnames, row))
+                    updates.append({**normalize_record(record), "id": record["id"]})
+                c.executemany(update_sql, updates)
+
+        conn.commit()
+
+        # Versioned indexes and other schema upgrades
+        version = c.execute("PRAGMA user_version").fetchone()[0]
+        for target, statements in enumerate(_MIGRATIONS[version:], start=version + 1):
+            with conn:
+                for statement in statements:
+                    c.execute(statement)
+                c.execute(f"PRAGMA user_version = {target}")
+
+def insert_trade(record: dict):
+    """
+    Insert one trade record (including suggestion/comment) into the database.
+    Keys in `record` must exactly match the column names (except id and the typed
+    columns, which are derived from the text fields here).
+    """
+    return insert_trades([record])
+
+def insert_trades(
+    records: Iterable[dict], batch_size: int = DEFAULT_BATCH_SIZE, normalized: bool = False
+) -> InsertResult:
+    """
+    Insert many trade records over one connection, committing once per batch of
+    `batch_size` rows with executemany. Records are keyed like insert_trade's; pass
+    normalized=True when they already carry the typed columns from normalize_record
+    (e.g. computed in worker processes) to skip recomputing them.
+    Trades whose fingerprint is already stored are skipped.
+    Returns InsertResult(inserted, skipped).
+    """
+    with connection() as conn:
+        inserted = skipped = 0
+        records = iter(records)
+        while True:
+            batch = list(islice(records, batch_size))
+            if not normalized:
+                batch = [{**record, **normalize_record(record)} for record in batch]
+            if not batch:
+                break
+            # One transaction per batch: committed on success, rolled back on error
+            with conn:
+                cur = conn.executemany(_INSERT_SQL, batch)
+                if cur.rowcount:
+                    _bump_data_version(conn)
+            inserted += cur.rowcount
+            skipped += len(batch) - cur.rowcount
+    return InsertResult(inserted, skipped)
+
+def get_data_version() -> int:
+    """
+    Return the trades table's data version. Every write path bumps it in the same
+    transaction as the write, so readers can cache results keyed on it.
+    """
+    with connection() as conn:
+        row = conn.execute("SELECT value FROM journal_meta WHERE key = 'data_version'").fetchone()
+    return row[0] if row else 0
+
+def _bump_data_version(conn):
+    """
+    Mark the trades table as changed. Call inside the transaction that writes to it.
+    """
+    conn.execute("UPDATE journal_meta SET value = value + 1 WHERE key = 'data_version'")
+
+def get_checkpoint(path: str):
+    """
+    Return (file_id, byte_offset) saved for a followed file, or (None, 0) if it has none.
+    """
+    with connection() as conn:
+        row = conn.execute(
+            "SELECT file_id, byte_offset FROM ingest_checkpoints WHERE path = ?", (path,)
+        ).fetchone()
+    return tuple(row) if row else (None, 0)
+
+def set_checkpoint(path: str, file_id: str, byte_offset: int):
+    """
+    Record how far into a followed file has been ingested.
+    """
+    with connection() as conn, conn:
+        conn.execute(
+            "INSERT INTO ingest_checkpoints (path, file_id, byte_offset, updated_at) "
+            "VALUES (?, ?, ?, ?) ON CONFLICT (path) DO UPDATE SET "
+            "file_id = excluded.file_id, byte_offset = excluded.byte_offset, updated_at = excluded.updated_at",
+            (path, file_id, byte_offset, datetime.now().isoformat()),
+        )
+
+def is_imported(path: str, size: int, mtime_ns: int) -> bool:
+    """
+    True if the import manifest already holds this exact file (same path, size and mtime),
+    whether it was imported or recorded as failed.
+    """
+    with connection() as conn:
+        row = conn.execute(
+            "SELECT 1 FROM import_manifest WHERE path = ? AND size = ? AND mtime_ns = ?",
+            (path, size, mtime_ns),
+        ).fetchone()
+    return row is not None
+
+def imported_hashes(hashes) -> set:
+    """
+    Return the subset of `hashes` (SHA-256 hex digests of file contents) already in the
+    import manifest, failed imports included.
+    """
+    hashes = list(hashes)
+    if not hashes:
+        return set()
+    with connection() as conn:
+        c = conn.execute(
+            f"SELECT sha256 FROM import_manifest WHERE sha256 IN ({', '.join('?' * len(hashes))})",
+            hashes,
+        )
+        return {row[0] for row in c.fetchall()}
+
+def record_imports(entries: Iterable[dict]):
+    """
+    Add files to the import manifest. Each entry has sha256, path, size, mtime_ns, parsed
+    (trade count) and optionally error (why the file couldn't be imported); a content hash
+    already present is left as first recorded.
+    """
+    imported_at = datetime.now().isoformat()
+    with connection() as conn, conn:
+        conn.executemany(
+            "INSERT OR IGNORE INTO import_manifest "
+            "(sha256, path, size, mtime_ns, parsed, error, imported_at) VALUES "
+            "(:sha256, :path, :size, :mtime_ns, :parsed, :error, :imported_at)",
+            [{"error": None, **entry, "imported_at": imported_at} for entry in entries],
+        )
+
+def fetch_all_trades():
+    """
+    Return a list of all saved trades as dicts (ordered by saved_at DESC).
+    """
+    with connection() as conn:
+        c = conn.execute("SELECT * FROM trades ORDER BY saved_at DESC")
+        rows = c.fetchall()
+        colnames = [desc[0] for desc in c.description]
+    trade_dicts = []
+    for row in rows:
+        trade_dicts.append({colnames[i]: row[i] for i in range(len(colnames))})
+    return trade_dicts
+
+def _trades_page_query(limit, after_cursor=None, filters=None, columns=None):
+    """
+    Build the SQL and parameters for one newest-first page of trades. With `columns`, only
+    those are selected, followed by saved_at and id (the page cursor).
+
+    After a cursor (s, i) the page is the rest of saved_at = s below id i, then saved_at < s.
+    SQLite can't seek a row-value comparison on both columns, so the two parts run as
+    separate index range scans: bulk imports stamp one saved_at on thousands of rows, and
+    `(saved_at, id) < (s, i)` would walk every newer row of that timestamp on each page.
+    """
+    clauses = []
+    params = []
+    for col, value in (filters or {}).items():
+        if col not in FILTER_COLUMNS:
+            raise ValueError(f"Cannot filter trades on unknown column {col!r}")
+        if isinstance(value, (list, tuple, set)):
+            value = list(value)
+            clauses.append(f"{col} IN ({', '.join('?' * len(value))})")
+            params.extend(value)
+        else:
+            clauses.append(f"{col} = ?")
+            params.append(value)
+
+    select = "*" if columns is None else ", ".join(list(columns) + ["saved_at", "id"])
+
+    def page(extra_clauses):
+        where = " AND ".join(extra_clauses + clauses)
+        where = f"WHERE {where} " if where else ""
+        return f"SELECT {select} FROM trades {where}ORDER BY saved_at DESC, id DESC LIMIT ?"
+
+    if after_cursor is None:
+        return page([]), params + [limit]
+
+    saved_at, last_id = after_cursor
+    sql = (
+        f"SELECT * FROM ({page(['saved_at = ?', 'id < ?'])}) "
+        f"UNION ALL SELECT * FROM ({page(['saved_at < ?'])}) "
+        "ORDER BY saved_at DESC, id DESC LIMIT ?"
+    )
+    return sql, [saved_at, last_id, *params, limit, saved_at, *params, limit, limit]
+
+def fetch_trades(limit: int = DEFAULT_PAGE_SIZE, after_cursor=None, filters: dict = None):
+    """
+    Return one page of saved trades (newest first) and the cursor for the next page.
+
+    Pages are keyset-paginated on (saved_at, id): pass the returned cursor back as
+    `after_cursor` to get the following page, which is read straight off the index
+    instead of offsetting through every earlier row. `filters` maps column names to a
+    value (or a list/tuple of values) to match. The cursor is None on the last page.
+    """
+    sql, params = _trades_page_query(limit + 1, after_cursor, filters)
+    with connection() as conn:
+        # One extra row tells us whether another page follows
+        c = conn.execute(sql, params)
+        rows = c.fetchall()
+        colnames = [desc[0] for desc in c.description]
+
+    trade_dicts = [dict(zip(colnames, row)) for row in rows[:limit]]
+    next_cursor = None
+    if len(rows) > limit:
+        last = trade_dicts[-1]
+        next_cursor = (last["saved_at"], last["id"])
+    return trade_dicts, next_cursor
+
+def fetch_trade_columns(
+    columns, limit: int = DEFAULT_PAGE_SIZE, after_cursor=None, filters: dict = None,
+    chunk_size: int = DEFAULT_FETCH_CHUNK,
+):
+    """
+    Column-oriented fetch_trades: return ({name: list of values}, next cursor) for one page,
+    ready to hand to a DataFrame. Rows are read from the cursor in `chunk_size` chunks and
+    transposed straight into per-column lists, so no dict is built per row. `columns` is a
+    list of column names, or a dict mapping column names to the names to return them under
+    (e.g. display labels).
+    """
+    if not isinstance(columns, dict):
+        columns = {col: col for col in columns}
+    unknown = set(columns) - FILTER_COLUMNS - {"id"}
+    if unknown:
+        raise ValueError(f"Cannot fetch unknown trade columns {sorted(unknown)!r}")
+
+    sql, params = _trades_page_query(limit + 1, after_cursor, filters, columns=list(columns))
+    # One list per selected column, plus saved_at and id for the cursor
+    values = [[] for _ in range(len(columns) + 2)]
+    fetched = 0
+    with connection() as conn:
+        c = conn.execute(sql, params)
+        while fetched < limit + 1:
+            rows = c.fetchmany(min(chunk_size, limit + 1 - fetched))
+            if not rows:
+                break
+            fetched += len(rows)
+            for column_values, chunk in zip(values, zip(*rows)):
+                column_values.extend(chunk)
+
+    next_cursor = None
+    # One extra row tells us whether another page follows
+    if fetched > limit:
+        for column_values in values:
+            del column_values[limit:]
+        next_cursor = (values[-2][-1], values[-1][-1])
+    return dict(zip(columns.values(), values)), next_cursor
+
+def distinct_values(column: str):
+    """
+    Return the distinct non-empty values of a filterable column, sorted. Served from the
+    column's index when it has one.
+    """
+    if column not in FILTER_COLUMNS:
+        raise ValueError(f"Unknown trades column {column!r}")
+    with connection() as conn:
+        c = conn.execute(
+            f"SELECT DISTINCT {column} FROM trades "
+            f"WHERE {column} IS NOT NULL AND {column} != '' ORDER BY {column}"
+        )
+        return [row[0] for row in c.fetchall()]
+
+def _fts_query(text: str):
+    """
+    Turn free text typed by a user into a safe FTS5 query: every word becomes a quoted
+    phrase (so operators and stray quotes can't cause syntax errors) and all must match.
+    A trailing "*" keeps a word a prefix search. Returns None when no words are left.
+    """
+    terms = []
+    for word in text.split():
+        prefix = word.endswith("*")
+        word = word.rstrip("*").replace('"', '""')
+        if word:
+            terms.append(f'"{word}"' + ("*" if prefix else ""))
+    return " ".join(terms) or None
+
+def search_trades(text: str, limit: int = DEFAULT_SEARCH_LIMIT):
+    """
+    Full-text search over header, suggestion and comment, best matches first (bm25).
+    Returns dicts with the trade's id, saved_at, header, underlying and account, plus the
+    header, suggestion and comment snippets with matched terms wrapped in
+    HIGHLIGHT_START/HIGHLIGHT_END.
+    """
+    query = _fts_query(text)
+    if query is None:
+        return []
+    with connection() as conn:
+        c = conn.execute(*_search_query(query, limit))
+        colnames = [desc[0] for desc in c.description]
+        return [dict(zip(colnames, row)) for row in c.fetchall()]
+
+def _search_query(query: str, limit: int):
+    """
+    Build the SQL and parameters of a ranked full-text search for an FTS5 `query`.
+    """
+    markers = [HIGHLIGHT_START, HIGHLIGHT_END]
+    sql = (
+        "SELECT t.id, t.saved_at, t.header, t.underlying, t.account, "
+        "highlight(trades_fts, 0, ?, ?) AS header_hit, "
+        "snippet(trades_fts, 1, ?, ?, '…', 16) AS suggestion_hit, "
+        "snippet(trades_fts, 2, ?, ?, '…', 16) AS comment_hit "
+        "FROM trades_fts JOIN trades t ON t.id = trades_fts.rowid "
+        f"WHERE trades_fts MATCH ? ORDER BY bm25(trades_fts, {', '.join(map(str, SEARCH_WEIGHTS))}) "
+        "LIMIT ?"
+    )
+    return sql, markers * 3 + [query, limit]
+
+# ─── QUERY PLAN DIAGNOSTICS ────────────────────────────────────────────────────
+
+def explain_query_plan(sql: str, params=()):
+    """
+    Return the EXPLAIN QUERY PLAN detail lines for `sql`, e.g.
+    ["SEARCH trades USING INDEX idx_trades_account (account=?)"].
+    """
+    with connection() as conn:
+        c = conn.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+        return [row[-1] for row in c.fetchall()]
+
+def _is_full_scan(detail: str) -> bool:
+    # Scanning a subquery's (already bounded) output is not a table scan
+    return detail.startswith("SCAN") and "INDEX" not in detail and "subquery" not in detail
+
+def _seeks_on_id(details) -> bool:
+    # A page after a cursor must reach its saved_at tie range through (saved_at = ? AND id < ?)
+    return any("saved_at=? AND id<?" in detail for detail in details)
+
+def dashboard_query_plans():
+    """
+    Explain every query the dashboard issues and report whether each is index-backed.
+    Returns {query name: (plan detail lines, True if no step is a full table scan and, for
+    pages after a cursor, the tie on saved_at is a seek on id)}.
+    """
+    cursor = ("9999-12-31", 2 ** 62)
+    queries = {
+        "first page": _trades_page_query(DEFAULT_PAGE_SIZE + 1),
+        "next page": _trades_page_query(DEFAULT_PAGE_SIZE + 1, cursor),
+    }
+    cursor_queries = {"next page"}
+    for column in ("account", "status", "underlying"):
+        queries[f"{column} filter"] = _trades_page_query(DEFAULT_PAGE_SIZE + 1, cursor, {column: ""})
+        cursor_queries.add(f"{column} filter")
+        queries[f"{column} values"] = (
+            f"SELECT DISTINCT {column} FROM trades "
+            f"WHERE {column} IS NOT NULL AND {column} != '' ORDER BY {column}",
+            [],
+        )
+    queries["submitted range"] = (
+        "SELECT * FROM trades WHERE submitted_ts BETWEEN ? AND ? ORDER BY submitted_ts",
+        [0, 2 ** 31],
+    )
+    queries["expiry range"] = (
+        "SELECT * FROM trades WHERE expiry BETWEEN ? AND ? ORDER BY expiry",
+        ["2025-01-01", "2025-12-31"],
+    )
+    queries["contract"] = (
+        "SELECT * FROM trades WHERE underlying = ? AND expiry = ? AND strike_cents = ?",
+        ["SPY", "2025-07-31", 64500],
+    )
+    queries["notes search"] = _search_query(_fts_query("stop loss"), DEFAULT_SEARCH_LIMIT)
+
+    plans = {}
+    for name, (sql, params) in queries.items():
+        details = explain_query_plan(sql, params)
+        indexed = not any(_is_full_scan(d) for d in details)
+        if name in cursor_queries:
+            indexed &= _seeks_on_id(details)
+        plans[name] = (details, indexed)
+    return plans
+
+
+if __name__ == "__main__":
+    # python database.py  →  check that every dashboard query is index-backed
+    init_db()
+    all_indexed = True
+    for name, (details, indexed) in dashboard_query_plans().items():
+        all_indexed &= indexed
+        print(f"{'OK  ' if indexed else 'SCAN'} {name}")
+        for detail in details:
+            print(f"       {detail}")
+    raise SystemExit(0 if all_indexed else 1)
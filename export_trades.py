@@ -0,0 +1,146 @@
+"""
+Columnar export: writes the trades table, typed columns included, to a Parquet dataset
+partitioned by month and account (Hive layout, e.g. month=2025-07/account=Individual/),
+ready for pandas, Polars or DuckDB. Needs pyarrow (pip install pyarrow).
+
+    python export_trades.py journal_parquet/
+    python export_trades.py journal_parquet/ --db /data/trades.db --row-group-size 50000
+"""
+
+import argparse
+import io
+import os
+import sys
+import tempfile
+import zipfile
+from pathlib import Path
+
+import database
+from normalize import TYPED_COLUMNS
+
+DEFAULT_ROW_GROUP_SIZE = 64 * 1024
+
+# Partition keys. month comes from the submitted time, or the save date if that didn't parse
+PARTITION_COLUMNS = ["month", "account"]
+_MONTH_SQL = "COALESCE(strftime('%Y-%m', submitted_ts, 'unixepoch'), substr(saved_at, 1, 7))"
+
+# Epoch-second columns exported as timestamps rather than plain integers
+_TIMESTAMP_COLUMNS = {"submitted_ts", "filled_ts"}
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.dataset
+    except ImportError as e:
+        raise ImportError(
+            "Parquet export needs pyarrow, which is not installed. Run: pip install pyarrow"
+        ) from e
+    return pyarrow, pyarrow.dataset
+
+
+def arrow_schema(pa):
+    """
+    Arrow schema of an exported row: id, the raw text columns, the typed columns and month.
+    """
+    sqlite_types = {"INTEGER": pa.int64(), "REAL": pa.float64(), "TEXT": pa.string()}
+    fields = [pa.field("id", pa.int64())]
+    fields += [pa.field(col, pa.string()) for col in database.RECORD_COLUMNS]
+    for col, sql_type in TYPED_COLUMNS.items():
+        if col in _TIMESTAMP_COLUMNS:
+            fields.append(pa.field(col, pa.timestamp("s", tz="UTC")))
+        else:
+            fields.append(pa.field(col, sqlite_types[sql_type]))
+    fields.append(pa.field("month", pa.string()))
+    return pa.schema(fields)
+
+
+def iter_record_batches(pa, schema, row_group_size=DEFAULT_ROW_GROUP_SIZE):
+    """
+    Read the trades table in id order, `row_group_size` rows at a time, yielding each chunk
+    as an Arrow RecordBatch, so only one chunk is in memory at once.
+    """
+    columns = [field.name for field in schema if field.name != "month"]
+    with database.connection() as conn:
+        c = conn.execute(f"SELECT {', '.join(columns)}, {_MONTH_SQL} AS month FROM trades ORDER BY id")
+        while True:
+            rows = c.fetchmany(row_group_size)
+            if not rows:
+                return
+            # Transpose to one list per column; Arrow builds each column array in one call
+            arrays = [pa.array(values, type=field.type) for values, field in zip(zip(*rows), schema)]
+            yield pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def export_parquet(out_dir, row_group_size=DEFAULT_ROW_GROUP_SIZE):
+    """
+    Write every saved trade under `out_dir` as a Parquet dataset partitioned by month and
+    account, streaming `row_group_size` rows per batch. Partitions written again replace
+    their earlier files. Returns the number of rows written.
+    """
+    pa, ds = _require_pyarrow()
+    schema = arrow_schema(pa)
+    partitioning = ds.partitioning(
+        pa.schema([schema.field(col) for col in PARTITION_COLUMNS]), flavor="hive"
+    )
+
+    written = 0
+
+    def counted(batches):
+        nonlocal written
+        for batch in batches:
+            written += batch.num_rows
+            yield batch
+
+    ds.write_dataset(
+        counted(iter_record_batches(pa, schema, row_group_size)),
+        out_dir,
+        schema=schema,
+        format="parquet",
+        partitioning=partitioning,
+        max_rows_per_group=row_group_size,
+        existing_data_behavior="delete_matching",
+    )
+    return written
+
+
+def export_parquet_zip(row_group_size=DEFAULT_ROW_GROUP_SIZE):
+    """
+    Export to a temporary directory and return (zip archive bytes, rows written), for the
+    dashboard's download button.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        rows = export_parquet(tmp, row_group_size)
+        buf = io.BytesIO()
+        with zipfile.ZipFile(buf, "w", zipfile.ZIP_STORED) as zf:
+            # Parquet pages are already compressed
+            for root, _, names in os.walk(tmp):
+                for name in names:
+                    path = os.path.join(root, name)
+                    zf.write(path, os.path.relpath(path, tmp))
+    return buf.getvalue(), rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("out_dir", help="directory to write the partitioned Parquet dataset to")
+    parser.add_argument("--db", default=str(database.DB_PATH), help="SQLite database to export")
+    parser.add_argument(
+        "--row-group-size", type=int, default=DEFAULT_ROW_GROUP_SIZE,
+        help="rows read and written per batch (bounds memory)",
+    )
+    args = parser.parse_args(argv)
+
+    database.DB_PATH = Path(args.db)
+    database.init_db()
+    try:
+        rows = export_parquet(args.out_dir, args.row_group_size)
+    except ImportError as e:
+        print(e, file=sys.stderr)
+        return 1
+    print(f"Exported {rows} trade(s) to {args.out_dir}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,93 +1,290 @@
+import io
 import json
+import mmap
 import os
 import re
+from concurrent.futures import ProcessPoolExecutor
 
-def parse_trade_file(path):
+LABELS = [
+    "Type",
+    "Position effect",
+    "Time in force",
+    "Submitted",
+    "Quantity",
+    "Account",
+    "Status",
+    "Filled quantity",
+    "Filled",
+    "Limit price",
+    "Est cost",
+    "Est regulatory fees"
+]
+
+# Label line → key in the parsed trade dictionary
+LABEL_FIELDS = {label: label for label in LABELS}
+
+# One or more blank (ASCII-whitespace-only) lines separating two blocks of raw bytes. Only
+# used to find safe cut points: text between two matches is still parsed line by line, where
+# Unicode-whitespace lines and lone \r line endings also separate blocks
+_BLANK_LINES = re.compile(rb'\n(?:[ \t\r\f\v]*\n)+')
+
+
+def _parse_block(lines):
     """
-    Reads a .txt file containing one or more trades (separated by at least one blank line)
-    and returns a list of dictionaries, each matching the requested JSON structure.
+    Turns the stripped, non-blank lines of one trade block (minus any “·” lines) into a
+    trade dictionary. Returns None when the block is too short to be a valid trade.
     """
-    labels = [
-        "Type",
-        "Position effect",
-        "Time in force",
-        "Submitted",
-        "Quantity",
-        "Account",
-        "Status",
-        "Filled quantity",
-        "Filled",
-        "Limit price",
-        "Est cost",
-        "Est regulatory fees"
-    ]
-
-    # 1) Read entire file as text
-    with open(path, 'r', encoding='utf-8') as f:
-        raw_text = f.read()
-
-    # 2) Split into blocks wherever there are one or more blank lines.
-    #    (r'\n\s*\n+' matches at least two consecutive newlines, possibly with spaces/tabs in between)
-    trade_blocks = re.split(r'\n\s*\n+', raw_text.strip())
+    # If there are fewer than 3 lines, it can't be a valid trade—skip it
+    if len(lines) < 3:
+        return None
 
-    all_trades = []
+    parsed = {}
 
-    for block in trade_blocks:
-        # 3) Split block into individual lines, strip each line, and drop blank lines
-        raw_lines = [line.strip() for line in block.splitlines()]
-        lines = [line for line in raw_lines if line]
+    # First line is the header (e.g. "Buy SPY $645 Call 7/31")
+    parsed["header"] = lines[0]
 
-        # 4) Drop any line containing “·” (e.g., "Individual · Jun 2")
-        lines = [line for line in lines if "·" not in line]
+    # Second line is Total Cost (e.g. "$94.00")
+    parsed["Total Cost"] = lines[1]
 
-        # If there are fewer than 3 lines, it can't be a valid trade—skip it
-        if len(lines) < 3:
+    # Third line is Quantity + Price (e.g. "2 contracts at $0.47")
+    parsed["Quantity + Price"] = lines[2]
+
+    # Everything from index 3 onward: a single pass that looks each line up as a label and
+    # grabs the next line as its value, so labels are picked up in any order
+    rest = iter(lines[3:])
+    for line in rest:
+        field = LABEL_FIELDS.get(line)
+        if field is not None:
+            value = next(rest, None)
+            if value is None:
+                break
+            # Keep the first occurrence if a label shows up twice
+            parsed.setdefault(field, value)
+
+    return parsed
+
+
+def _iter_line_trades(lines):
+    """
+    Groups text lines into blocks and yields each parsed trade. Any line that strips to
+    nothing (including Unicode whitespace such as NBSP) ends the current block. Every
+    parser in this module goes through here, so they all agree on what a block is.
+    """
+    block = []
+    for line in lines:
+        # A line holding only whitespace ends the current block
+        line = line.strip()
+        if line:
+            # Drop any line containing “·” (e.g., "Individual · Jun 2")
+            if "·" not in line:
+                block.append(line)
             continue
+        if block:
+            parsed = _parse_block(block)
+            if parsed is not None:
+                yield parsed
+            block = []
+
+    # The last block has no blank line after it
+    if block:
+        parsed = _parse_block(block)
+        if parsed is not None:
+            yield parsed
+
+
+def iter_trades(source):
+    """
+    Lazily parses a .txt file containing one or more trades (separated by at least one blank line).
+    `source` can be a path, the file's raw bytes, or any open file object (text or binary,
+    e.g. a Streamlit UploadedFile), so uploads never have to touch the disk; use
+    parse_trade_text for already-decoded text. Yields one trade dictionary as soon as its
+    block ends, so memory stays bounded by the largest block rather than the whole file.
+    """
+    detach = None
+    close = False
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        f = io.TextIOWrapper(io.BytesIO(source), encoding='utf-8')
+    elif hasattr(source, "read"):
+        f = source
+        # Binary file objects are decoded as they are read
+        if isinstance(source.read(0), bytes):
+            f = detach = io.TextIOWrapper(source, encoding='utf-8')
+    else:
+        f = open(source, 'r', encoding='utf-8')
+        close = True
+
+    try:
+        yield from _iter_line_trades(f)
+    finally:
+        if close:
+            f.close()
+        elif detach is not None:
+            # Leave the caller's file object open
+            detach.detach()
+
+
+def iter_block_spans(buf, start=0, end=None):
+    """
+    Scans raw bytes (bytes or an mmap) for blank-line separators and yields the
+    (start, end) byte offsets of every block between `start` and `end`.
+    """
+    if end is None:
+        end = len(buf)
+
+    pos = start
+    for sep in _BLANK_LINES.finditer(buf, start, end):
+        if sep.start() > pos:
+            yield pos, sep.start()
+        pos = sep.end()
+
+    if pos < end:
+        yield pos, end
+
+
+def last_block_boundary(buf, start=0, end=None):
+    """
+    Return the offset just past the last blank-line separator in buf[start:end] — i.e. where
+    the last complete block ends — or None if no separator follows any block yet. Anything
+    after it may be a block that is still being written.
+    """
+    if end is None:
+        end = len(buf)
+
+    boundary = None
+    for sep in _BLANK_LINES.finditer(buf, start, end):
+        boundary = sep.end()
+    return boundary
+
+
+def iter_trades_mmap(path, start=0, end=None):
+    """
+    Memory-mapped variant of iter_trades for very large exports, with the same output.
+    Blank-line separators are located on the raw bytes and only the text between two of
+    them is copied out and decoded at a time, so the file is never held as one decoded
+    string. `start`/`end` restrict parsing to a byte range that begins and ends on block
+    boundaries.
+    """
+    with open(path, 'rb') as f:
+        # mmap refuses empty files
+        if os.fstat(f.fileno()).st_size == 0:
+            return
 
-        parsed = {}
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for block_start, block_end in iter_block_spans(mm, start, end):
+                # Only this span is copied out of the mapping and decoded. It can still hold
+                # several blocks (separated by Unicode-whitespace lines or CR-only line
+                # endings), so it is read with universal newlines like iter_trades
+                text = mm[block_start:block_end].decode('utf-8')
+                yield from _iter_line_trades(io.StringIO(text, newline=None))
 
-        # 5) First line is the header (e.g. "Buy SPY $645 Call 7/31")
-        parsed["header"] = lines[0]
 
-        # 6) Second line is Total Cost (e.g. "$94.00")
-        parsed["Total Cost"] = lines[1]
+def _parse_range(path, start, end):
+    return list(iter_trades_mmap(path, start, end))
 
-        # 7) Third line is Quantity + Price (e.g. "2 contracts at $0.47")
-        parsed["Quantity + Price"] = lines[2]
 
-        # 8) Everything from index 3 onward: look for each label and grab the next line
-        idx = 3
-        for label in labels:
-            # Advance idx until it either matches the label or runs out
-            while idx < len(lines) and lines[idx] != label:
-                idx += 1
+def find_split_points(path, parts):
+    """
+    Cuts a TXT export into `parts` byte ranges whose edges all fall on blank-line block
+    boundaries, so no block is shared between two ranges. Returns a list of (start, end).
+    """
+    size = os.path.getsize(path)
+    if size == 0 or parts <= 1:
+        return [(0, size)]
 
-            # If we found the label and there is a next line, capture it
-            if idx < len(lines) and lines[idx] == label and (idx + 1) < len(lines):
-                parsed[label] = lines[idx + 1]
-                idx += 2
-            else:
-                # Label not found or no line after it; just move on
-                idx += 1
+    bounds = [0]
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        for i in range(1, parts):
+            # The first separator at or after the nominal cut ends the previous range
+            target = max(size * i // parts - 1, bounds[-1])
+            sep = _BLANK_LINES.search(mm, target)
+            if sep is None:
+                break
+            if sep.end() > bounds[-1]:
+                bounds.append(sep.end())
 
-        all_trades.append(parsed)
+    if bounds[-1] < size:
+        bounds.append(size)
+    return list(zip(bounds, bounds[1:]))
 
+
+def parse_trade_file_parallel(path, workers=None):
+    """
+    Parses a large .txt export on several cores. The file is split at blank-line boundaries
+    into one byte range per worker, each range is parsed in its own process and the results
+    are merged back in file order, so the output is identical to parse_trade_file.
+    """
+    workers = workers or os.cpu_count() or 1
+    ranges = find_split_points(path, workers)
+    if len(ranges) == 1:
+        return _parse_range(path, *ranges[0])
+
+    all_trades = []
+    with ProcessPoolExecutor(max_workers=len(ranges)) as pool:
+        for trades in pool.map(_parse_range, [path] * len(ranges), *zip(*ranges)):
+            all_trades.extend(trades)
     return all_trades
 
 
+def parse_trade_file(path):
+    """
+    Reads a .txt file containing one or more trades (separated by at least one blank line)
+    and returns a list of dictionaries, each matching the requested JSON structure.
+    Also accepts raw bytes or an open file object (see iter_trades).
+    """
+    return list(iter_trades(path))
+
+
+def parse_trade_text(text):
+    """
+    Same as parse_trade_file for the contents of an export already held as str (or bytes).
+    """
+    if isinstance(text, str):
+        # Universal newlines, as when the file is opened
+        text = io.StringIO(text, newline=None)
+    return list(iter_trades(text))
+
+
+def write_ndjson(trades, out):
+    """
+    Writes trades to the text file object `out` as NDJSON: one compact JSON object per
+    line, each written as soon as it arrives. Returns the number of trades written.
+    """
+    count = 0
+    for trade in trades:
+        out.write(json.dumps(trade, ensure_ascii=False, separators=(",", ":")))
+        out.write("\n")
+        count += 1
+    return count
+
+
 if __name__ == "__main__":
-    # Replace this with the path to your multi‐trade .txt file:
-    spyc_path = "trade_order_raw.txt"
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Convert a multi-trade .txt export to JSON.")
+    # Replace the default with the path to your multi‐trade .txt file, or pass it in
+    parser.add_argument("txt_path", nargs="?", default="trade_order_raw.txt")
+    parser.add_argument(
+        "--format", choices=("json", "ndjson"), default="json",
+        help="json: one indented array; ndjson: one compact trade per line, streamed as parsed",
+    )
+    parser.add_argument("-o", "--output", help="output path (default: <same_base>.json/.ndjson)")
+    args = parser.parse_args()
 
-    # Parse all trades in the file
-    result = parse_trade_file(spyc_path)
+    # Derive the output filename: replace .txt with .json / .ndjson
+    base, ext = os.path.splitext(args.txt_path)
+    out_path = args.output or f"{base}.{args.format}"
 
-    # Derive the JSON filename: replace .txt with .json
-    base, ext = os.path.splitext(spyc_path)
-    json_path = base + ".json"
+    if args.format == "ndjson":
+        # Blocks are written as they are parsed; the file is never held in memory
+        with open(out_path, 'w', encoding='utf-8') as out:
+            count = write_ndjson(iter_trades(args.txt_path), out)
+    else:
+        # Parse all trades in the file
+        result = parse_trade_file(args.txt_path)
 
-    # Write the list of trade‐dictionaries out to <same_base>.json
-    with open(json_path, 'w', encoding='utf-8') as jf:
-        json.dump(result, jf, indent=4)
+        # Write the list of trade‐dictionaries out to <same_base>.json
+        with open(out_path, 'w', encoding='utf-8') as jf:
+            json.dump(result, jf, indent=4)
+        count = len(result)
 
-    print(f"Parsed {len(result)} trade(s) saved to: {json_path}")
+    print(f"Parsed {count} trade(s) saved to: {out_path}")
@@ -0,0 +1,220 @@
+"""
+Headless bulk importer: parses TXT, JSON and NDJSON trade exports in parallel and writes
+them straight into the journal database, without Streamlit.
+
+    python import_trades.py exports/                  # every .txt/.json under a directory
+    python import_trades.py "2025-*/*.txt" day.json   # globs and files
+    python import_trades.py exports/ --db /data/trades.db --workers 8
+    python import_trades.py --stream huge.json        # constant memory, batched inserts
+    python import_trades.py --follow session.txt      # tail a growing TXT log
+    python import_trades.py --watch inbox/            # import files dropped into a folder
+"""
+
+import argparse
+import glob
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+import database
+from ingest import DirectoryWatcher, IngestError, IngestionPipeline, TradeLogFollower, prepare_file
+
+
+def collect_files(inputs, extensions):
+    """
+    Expand files, directories (searched recursively) and glob patterns into a sorted,
+    de-duplicated list of files with one of `extensions`.
+    """
+    found = set()
+    for item in inputs:
+        matches = glob.glob(item, recursive=True) if glob.has_magic(item) else [item]
+        for match in matches:
+            if os.path.isdir(match):
+                for root, _, names in os.walk(match):
+                    found.update(os.path.join(root, name) for name in names)
+            elif os.path.isfile(match):
+                found.add(match)
+    return sorted(path for path in found if os.path.splitext(path)[1].lower() in extensions)
+
+
+def import_files(paths, workers=None, batch_size=database.DEFAULT_BATCH_SIZE, log=print):
+    """
+    Import `paths` into DB_PATH: files are prepared on a process pool and each file's
+    records are deduped and bulk inserted here as soon as they arrive, in file order.
+    Returns a summary dict of counts, stage timings and elapsed seconds.
+    """
+    database.init_db()
+    pipeline = IngestionPipeline(batch_size=batch_size)
+    saved_at = datetime.now().isoformat()
+    summary = {
+        "files": 0, "failed": 0, "bytes": 0, "parsed": 0,
+        "incomplete": 0, "inserted": 0, "skipped": 0,
+    }
+
+    start = time.perf_counter()
+    workers = workers or os.cpu_count() or 1
+    if workers > 1 and len(paths) > 1:
+        pool = ProcessPoolExecutor(max_workers=min(workers, len(paths)))
+        results = pool.map(prepare_file, paths, [saved_at] * len(paths))
+    else:
+        pool = None
+        results = (prepare_file(path, saved_at) for path in paths)
+
+    try:
+        for path, size, prepared, error, seconds in results:
+            for stage, spent in seconds.items():
+                pipeline.stage_seconds[stage] += spent
+            summary["files"] += 1
+            summary["bytes"] += size
+            if error is not None:
+                summary["failed"] += 1
+                log(f"FAILED {path}: {error}")
+                continue
+
+            stored = pipeline.store(prepared["records"])
+            for key in ("parsed", "incomplete"):
+                summary[key] += prepared[key]
+            for key in ("inserted", "skipped"):
+                summary[key] += stored[key]
+            log(
+                f"{path}: {prepared['parsed']} parsed, {stored['inserted']} inserted, "
+                f"{stored['skipped']} skipped"
+            )
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    summary["seconds"] = time.perf_counter() - start
+    summary["stage_seconds"] = dict(pipeline.stage_seconds)
+    return summary
+
+
+def stream_files(paths, batch_size=database.DEFAULT_BATCH_SIZE, log=print):
+    """
+    Import `paths` one after another with IngestionPipeline.run_stream: each file is decoded
+    incrementally and inserted `batch_size` trades at a time, so memory stays flat even for
+    multi-gigabyte JSON arrays. Returns the same summary as import_files().
+    """
+    database.init_db()
+    pipeline = IngestionPipeline(batch_size=batch_size)
+    summary = {
+        "files": 0, "failed": 0, "bytes": 0, "parsed": 0,
+        "incomplete": 0, "inserted": 0, "skipped": 0,
+    }
+
+    start = time.perf_counter()
+    for path in paths:
+        summary["files"] += 1
+        try:
+            with open(path, 'rb') as f:
+                counts = pipeline.run_stream(f, path)
+            summary["bytes"] += os.path.getsize(path)
+        except (OSError, IngestError) as e:
+            summary["failed"] += 1
+            log(f"FAILED {path}: {e}")
+            continue
+
+        for key in ("parsed", "incomplete", "inserted", "skipped"):
+            summary[key] += counts[key]
+        log(
+            f"{path}: {counts['parsed']} parsed, {counts['inserted']} inserted, "
+            f"{counts['skipped']} skipped"
+        )
+
+    summary["seconds"] = time.perf_counter() - start
+    summary["stage_seconds"] = dict(pipeline.stage_seconds)
+    return summary
+
+
+def format_summary(summary):
+    elapsed = max(summary["seconds"], 1e-9)
+    lines = [
+        f"Imported {summary['files']} file(s) ({summary['failed']} failed), "
+        f"{summary['parsed']} trade(s) parsed: {summary['inserted']} inserted, "
+        f"{summary['skipped']} skipped as duplicates, {summary['incomplete']} with missing fields",
+        f"{elapsed:.2f}s · {summary['files'] / elapsed:.1f} files/s · "
+        f"{summary['parsed'] / elapsed:.0f} trades/s · {summary['bytes'] / 1e6 / elapsed:.2f} MB/s",
+        "Stage time (summed over workers): " + ", ".join(
+            f"{stage} {seconds:.2f}s" for stage, seconds in summary["stage_seconds"].items()
+        ),
+    ]
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("inputs", nargs="*", help="TXT/JSON/NDJSON files, directories or glob patterns")
+    parser.add_argument("--db", default=str(database.DB_PATH), help="SQLite database to import into")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="parser processes")
+    parser.add_argument(
+        "--batch-size", type=int, default=database.DEFAULT_BATCH_SIZE, help="rows per insert transaction"
+    )
+    parser.add_argument("--quiet", action="store_true", help="only print the summary")
+    parser.add_argument(
+        "--stream", action="store_true",
+        help="decode each file incrementally and insert in batches (one file at a time, flat memory)",
+    )
+    parser.add_argument(
+        "--follow", metavar="TXT", help="keep ingesting blocks appended to this TXT log (Ctrl-C to stop)"
+    )
+    parser.add_argument(
+        "--interval", type=float, default=1.0, help="follow/watch mode: seconds between polls"
+    )
+    parser.add_argument(
+        "--settle", type=float, default=5.0,
+        help="follow mode: seconds a file must be quiet before an unterminated last block is taken",
+    )
+    parser.add_argument(
+        "--watch", metavar="DIR", help="keep importing new files dropped into this folder (Ctrl-C to stop)"
+    )
+    parser.add_argument(
+        "--debounce", type=float, default=2.0,
+        help="watch mode: seconds the folder must be quiet before a batch is imported",
+    )
+    args = parser.parse_args(argv)
+    if sum(map(bool, (args.inputs, args.follow, args.watch))) != 1:
+        parser.error("give either input files, --follow or --watch")
+
+    database.DB_PATH = Path(args.db)
+
+    if args.follow:
+        database.init_db()
+        follower = TradeLogFollower(args.follow, settle_seconds=args.settle)
+        try:
+            follower.run(interval=args.interval)
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    if args.watch:
+        database.init_db()
+        pipeline = IngestionPipeline(batch_size=args.batch_size)
+        watcher = DirectoryWatcher(
+            args.watch, pipeline, workers=args.workers, debounce_seconds=args.debounce
+        )
+        try:
+            watcher.run(interval=args.interval)
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    extensions = {ext for source in IngestionPipeline().sources.values() for ext in source.extensions}
+    paths = collect_files(args.inputs, extensions)
+    if not paths:
+        print(f"No {'/'.join(sorted(extensions))} files matched.", file=sys.stderr)
+        return 1
+
+    log = (lambda message: None) if args.quiet else print
+    if args.stream:
+        summary = stream_files(paths, batch_size=args.batch_size, log=log)
+    else:
+        summary = import_files(paths, workers=args.workers, batch_size=args.batch_size, log=log)
+    print(format_summary(summary))
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,812 @@
+import codecs
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from datetime import datetime
+
+from database import (
+    DEFAULT_BATCH_SIZE, get_checkpoint, imported_hashes, insert_trades, is_imported,
+    record_imports, set_checkpoint,
+)
+from formatter import iter_trades, last_block_boundary, parse_trade_text
+from normalize import normalize_record, trade_fingerprint
+
+# Uploaded/parsed trade key → trades column, in display order
+FIELD_COLUMNS = {
+    "header": "header",
+    "Total Cost": "total_cost",
+    "Quantity + Price": "quantity_price",
+    "Type": "type",
+    "Position effect": "position_effect",
+    "Time in force": "time_in_force",
+    "Submitted": "submitted",
+    "Quantity": "quantity",
+    "Account": "account",
+    "Status": "status",
+    "Filled quantity": "filled_quantity",
+    "Filled": "filled",
+    "Limit price": "limit_price",
+    "Est cost": "est_cost",
+    "Est regulatory fees": "est_reg_fees",
+}
+
+
+def field_values(trade: dict) -> dict:
+    """
+    The trade's fields keyed by trades column, as the text to_record stores: missing and
+    null fields become "" and values are stripped.
+    """
+    return {
+        column: "" if trade.get(field) is None else str(trade[field]).strip()
+        for field, column in FIELD_COLUMNS.items()
+    }
+
+
+# Pipeline stages, in the order run() applies them
+STAGES = ("decode", "normalize", "validate", "dedupe", "persist")
+
+# Upload bytes the parse cache may hold parses for before evicting the least recently used
+DEFAULT_PARSE_CACHE_BYTES = 64 * 1024 * 1024
+
+# Bytes read per step by the streaming JSON decoder
+JSON_CHUNK_SIZE = 64 * 1024
+# Largest single array element the streaming JSON decoder will buffer
+JSON_MAX_ELEMENT_BYTES = 16 * 1024 * 1024
+
+
+class IngestError(ValueError):
+    """
+    Raised when an upload cannot be decoded into trades.
+    """
+
+
+# ─── SOURCES ───────────────────────────────────────────────────────────────────
+
+class TradeSource:
+    """
+    Turns the raw bytes of one uploaded/exported file into a list of trade dictionaries
+    keyed like parse_trade_file's output. Subclass and register with the pipeline to add
+    a format (e.g. CSV).
+    """
+    name = ""
+    extensions = ()
+
+    def decode(self, data: bytes, file_name: str) -> list:
+        raise NotImplementedError
+
+    def iter_decode(self, stream, file_name: str):
+        """
+        Yield the trades of a binary file object one at a time. Sources that can decode
+        incrementally override this; the default reads the whole stream and calls decode().
+        """
+        yield from self.decode(stream.read(), file_name)
+
+
+class JsonSource(TradeSource):
+    """
+    A JSON file holding a single trade object or a list of trade objects.
+    """
+    name = "json"
+    extensions = (".json",)
+
+    def decode(self, data, file_name):
+        try:
+            parsed_json = json.loads(data.decode("utf-8"))
+        except Exception as e:
+            raise IngestError(f"Could not parse {file_name} as JSON: {e}") from e
+
+        # Ensure we always have a list of trade‐dicts
+        if isinstance(parsed_json, dict):
+            return [parsed_json]
+        if isinstance(parsed_json, list):
+            for idx, trade in enumerate(parsed_json):
+                self._check_trade(trade, idx, file_name)
+            return parsed_json
+        raise IngestError(f"{file_name} does not contain a JSON object or array.")
+
+    def iter_decode(self, stream, file_name):
+        try:
+            for idx, trade in enumerate(iter_json_trades(stream)):
+                self._check_trade(trade, idx, file_name)
+                yield trade
+        except IngestError:
+            raise
+        except (ValueError, UnicodeDecodeError) as e:
+            raise IngestError(f"Could not parse {file_name} as JSON: {e}") from e
+
+    @staticmethod
+    def _check_trade(trade, idx, file_name):
+        if not isinstance(trade, dict):
+            raise IngestError(f"Element {idx} of {file_name} is not a JSON object.")
+
+
+class NdjsonSource(TradeSource):
+    """
+    Newline-delimited JSON: one trade object per line, as written by
+    `python formatter.py --format ndjson`. Blank lines are ignored.
+    """
+    name = "ndjson"
+    extensions = (".ndjson", ".jsonl")
+
+    def decode(self, data, file_name):
+        return list(self.iter_decode(io.BytesIO(data), file_name))
+
+    def iter_decode(self, stream, file_name):
+        for line_no, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                trade = json.loads(line)
+            except ValueError as e:
+                raise IngestError(f"Could not parse line {line_no} of {file_name} as JSON: {e}") from e
+            if not isinstance(trade, dict):
+                raise IngestError(f"Line {line_no} of {file_name} is not a JSON object.")
+            yield trade
+
+
+class TxtSource(TradeSource):
+    """
+    A broker TXT export in the block format read by formatter.parse_trade_file.
+    """
+    name = "txt"
+    extensions = (".txt",)
+
+    def decode(self, data, file_name):
+        # Parsed straight from memory; no temp file round trip
+        try:
+            return parse_trade_text(data)
+        except UnicodeDecodeError as e:
+            raise IngestError(f"Could not decode {file_name} as UTF-8 text: {e}") from e
+
+    def iter_decode(self, stream, file_name):
+        try:
+            yield from iter_trades(stream)
+        except UnicodeDecodeError as e:
+            raise IngestError(f"Could not decode {file_name} as UTF-8 text: {e}") from e
+
+
+def iter_json_trades(stream, chunk_size=JSON_CHUNK_SIZE, max_element_bytes=JSON_MAX_ELEMENT_BYTES):
+    """
+    Incrementally decode a JSON array of trade objects (or a single object) from a binary
+    file object, yielding one element at a time. Only `chunk_size` bytes plus the element
+    being decoded are held in memory, however long the array is; an element larger than
+    `max_element_bytes` is an error. Error messages give absolute byte offsets.
+    """
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    buf = ""
+    pos = 0
+    eof = False
+    # Byte offset of buf[0] in the file
+    base = 0
+
+    def fill():
+        # Drop what has been consumed, then append the next chunk
+        nonlocal buf, pos, eof, base
+        chunk = stream.read(chunk_size)
+        eof = not chunk
+        base += len(buf[:pos].encode("utf-8"))
+        buf = buf[pos:] + utf8.decode(chunk, final=eof)
+        pos = 0
+
+    def offset(at):
+        return base + len(buf[:at].encode("utf-8"))
+
+    def skip_whitespace():
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos] in " \t\r\n":
+                pos += 1
+            if pos < len(buf) or eof:
+                return
+            fill()
+
+    while not buf and not eof:
+        fill()
+    # Step over a UTF-8 BOM as consumed text, so offsets still count its three bytes even
+    # when it arrived split across chunks
+    if buf.startswith("\ufeff"):
+        pos = 1
+    skip_whitespace()
+    if pos == len(buf):
+        raise ValueError("empty document")
+    in_array = buf[pos] == "["
+    if not in_array and buf[pos] != "{":
+        raise ValueError("document is not a JSON object or array")
+    if in_array:
+        pos += 1
+    # True: a value or "]" may follow; None: a value must follow (after ","); False: "," or "]"
+    expect_value = True
+
+    while True:
+        skip_whitespace()
+        if pos == len(buf):
+            if in_array:
+                raise ValueError(f"unterminated array at byte {offset(pos)}")
+            return
+        if in_array and buf[pos] == "]" and (expect_value is not None):
+            pos += 1
+            skip_whitespace()
+            if pos < len(buf):
+                raise ValueError(f"extra data after array at byte {offset(pos)}")
+            return
+        if expect_value is False:
+            if not in_array or buf[pos] != ",":
+                raise ValueError(f"expected ',' or ']' at byte {offset(pos)}")
+            pos += 1
+            expect_value = None
+            continue
+
+        try:
+            value, end = decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError as e:
+            # Only an error the rest of the file could still resolve (the element runs off
+            # the end of the buffer) is worth reading more for; anything else is a real
+            # syntax error, reported without pulling in the rest of the file
+            if eof or not _maybe_truncated(e, len(buf)):
+                raise ValueError(f"{e.msg} at byte {offset(e.pos)}") from None
+            if len(buf) - pos > max_element_bytes:
+                raise ValueError(
+                    f"element at byte {offset(pos)} is larger than {max_element_bytes} bytes"
+                ) from None
+            fill()
+            continue
+        # A value touching the end of the buffer may be cut short (e.g. a number); only
+        # accept it once the next character has been read
+        if end == len(buf) and not eof:
+            fill()
+            continue
+        pos = end
+        yield value
+        if not in_array:
+            skip_whitespace()
+            if pos < len(buf):
+                raise ValueError(f"extra data at byte {offset(pos)}")
+            return
+        expect_value = False
+
+
+def _maybe_truncated(error, buffer_length):
+    """
+    True if a JSONDecodeError could be caused by the buffer ending mid-element rather than
+    by bad syntax: it points at the very end (allowing for a cut \\uXXXX escape), or a
+    string runs to the end without its closing quote.
+    """
+    return error.pos >= buffer_length - 6 or error.msg.startswith("Unterminated string")
+
+
+# ─── PARSE CACHE ───────────────────────────────────────────────────────────────
+
+class ParseCache:
+    """
+    LRU cache of decoded trade lists keyed by (source, SHA-256 of the file's bytes), so a
+    Streamlit rerun with the same uploads costs a hash per file instead of a full parse.
+
+    The bound is on the total size of the uploads whose parses are kept (`max_bytes`); the
+    least recently used entries are evicted past it. Cached lists are shared between
+    callers and must not be mutated. Safe to share across Streamlit's script threads.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_PARSE_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(source_name, data: bytes):
+        return source_name, hashlib.sha256(data).hexdigest()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, trades, size):
+        # A file bigger than the whole cache would only evict everything else
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self.total_bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (trades, size)
+            self.total_bytes += size
+            while self.total_bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.total_bytes -= evicted_size
+
+    def __len__(self):
+        return len(self._entries)
+
+
+# ─── PIPELINE ──────────────────────────────────────────────────────────────────
+
+class IngestionPipeline:
+    """
+    Shared decode → normalize → validate → dedupe → persist pipeline behind every way trades
+    get into the journal (Streamlit uploads, headless imports).
+
+    Each stage can be called on its own (the dashboard decodes and validates, lets the user
+    edit, then normalizes and persists) or all together through run(). Every stage call is
+    timed: totals accumulate in `stage_seconds` / `stage_items`, and any hook registered with
+    add_hook is called as hook(stage, seconds, items). Pass a ParseCache to skip decoding
+    files whose bytes were decoded before.
+    """
+
+    def __init__(self, sources=None, batch_size=DEFAULT_BATCH_SIZE, cache=None):
+        self.sources = {}
+        for source in sources or (JsonSource(), NdjsonSource(), TxtSource()):
+            self.register(source)
+        self.batch_size = batch_size
+        self.cache = cache
+        self.hooks = []
+        self.stage_seconds = {stage: 0.0 for stage in STAGES}
+        self.stage_items = {stage: 0 for stage in STAGES}
+
+    def register(self, source: TradeSource):
+        self.sources[source.name] = source
+
+    def add_hook(self, hook):
+        self.hooks.append(hook)
+
+    def source_for(self, file_name):
+        """
+        Pick the registered source whose extensions match `file_name`.
+        """
+        ext = os.path.splitext(file_name)[1].lower()
+        for source in self.sources.values():
+            if ext in source.extensions:
+                return source
+        raise IngestError(f"No trade source handles {file_name}")
+
+    @contextmanager
+    def _timed(self, stage, counter):
+        start = time.perf_counter()
+        yield counter
+        seconds = time.perf_counter() - start
+        self.stage_seconds[stage] += seconds
+        self.stage_items[stage] += counter[0]
+        for hook in self.hooks:
+            hook(stage, seconds, counter[0])
+
+    # ─── Stages ───
+
+    def decode(self, source_name, data: bytes, file_name: str) -> list:
+        """
+        Decode the raw bytes of one file with the named source into trade dictionaries.
+        With a cache, identical bytes seen before return the earlier (shared) list.
+        """
+        with self._timed("decode", [0]) as counter:
+            key = trades = None
+            if self.cache is not None:
+                key = self.cache.key(source_name, data)
+                trades = self.cache.get(key)
+            if trades is None:
+                trades = self.sources[source_name].decode(data, file_name)
+                if key is not None:
+                    self.cache.put(key, trades, len(data))
+            counter[0] = len(trades)
+        return trades
+
+    def to_record(self, trade: dict, overrides=None, suggestion="", comment="", saved_at=None) -> dict:
+        """
+        Map one trade dictionary onto the trades columns. `overrides` maps column names to
+        edited values that win over the trade's own (None means "not edited").
+        """
+        overrides = overrides or {}
+        record = field_values(trade)
+        for column in FIELD_COLUMNS.values():
+            value = overrides.get(column)
+            if value is not None:
+                record[column] = str(value).strip()
+        record["suggestion"] = suggestion or ""
+        record["comment"] = comment or ""
+        record["saved_at"] = saved_at or datetime.now().isoformat()
+        return record
+
+    def normalize(self, trades, saved_at=None) -> list:
+        """
+        Turn trade dictionaries into records carrying the typed columns, ready for
+        persist(records, normalized=True).
+        """
+        saved_at = saved_at or datetime.now().isoformat()
+        with self._timed("normalize", [0]) as counter:
+            records = []
+            for trade in trades:
+                record = self.to_record(trade, saved_at=saved_at)
+                record.update(normalize_record(record))
+                records.append(record)
+            counter[0] = len(records)
+        return records
+
+    def missing_fields(self, trade: dict) -> list:
+        """
+        Return the expected fields a trade dictionary lacks, in display order.
+        """
+        return [field for field in FIELD_COLUMNS if field not in trade]
+
+    def validate(self, trades) -> list:
+        """
+        Return (index, missing fields) for every trade dictionary that lacks expected fields.
+        """
+        with self._timed("validate", [0]) as counter:
+            problems = []
+            for idx, trade in enumerate(trades):
+                missing = self.missing_fields(trade)
+                if missing:
+                    problems.append((idx, missing))
+            counter[0] = len(trades)
+        return problems
+
+    def dedupe(self, records) -> list:
+        """
+        Drop records whose fingerprint repeats an earlier record's within this batch (the
+        database skips ones it already holds).
+        """
+        with self._timed("dedupe", [0]) as counter:
+            seen = set()
+            unique = []
+            for record in records:
+                key = record.get("fingerprint") or trade_fingerprint(record)
+                if key not in seen:
+                    seen.add(key)
+                    unique.append(record)
+            counter[0] = len(records)
+        return unique
+
+    def persist(self, records, normalized=False, batch_size=None):
+        """
+        Write records with insert_trades in batches of `batch_size` (default: the pipeline's),
+        skipping trades already in the journal. Pass normalized=True for records that came
+        out of normalize(). Returns InsertResult(inserted, skipped).
+        """
+        with self._timed("persist", [0]) as counter:
+            result = insert_trades(
+                records, batch_size=batch_size or self.batch_size, normalized=normalized
+            )
+            counter[0] = result.inserted
+        return result
+
+    # ─── Whole pipeline ───
+
+    def prepare(self, data: bytes, file_name: str, source_name=None, saved_at=None) -> dict:
+        """
+        The CPU-bound half of run(): decode, normalize and validate one file. Safe to call
+        in a worker process; hand the records to store() in the writing process.
+        Returns {"parsed", "incomplete", "records"}.
+        """
+        source_name = source_name or self.source_for(file_name).name
+        trades = self.decode(source_name, data, file_name)
+        records = self.normalize(trades, saved_at=saved_at)
+        problems = self.validate(trades)
+        return {"parsed": len(trades), "incomplete": len(problems), "records": records}
+
+    def store(self, records) -> dict:
+        """
+        The writing half of run(): dedupe and persist records from prepare().
+        Returns {"inserted", "skipped"}, where skipped counts duplicates within the records
+        and trades already in the journal.
+        """
+        unique = self.dedupe(records)
+        result = self.persist(unique, normalized=True)
+        return {"inserted": result.inserted, "skipped": result.skipped + len(records) - len(unique)}
+
+    def run(self, data: bytes, file_name: str, source_name=None) -> dict:
+        """
+        Decode, normalize, validate, dedupe and persist one file without any editing step.
+        Returns counts: {"parsed", "incomplete", "inserted", "skipped"}.
+        """
+        prepared = self.prepare(data, file_name, source_name)
+        stored = self.store(prepared["records"])
+        return {"parsed": prepared["parsed"], "incomplete": prepared["incomplete"], **stored}
+
+    def run_stream(self, stream, file_name: str, source_name=None) -> dict:
+        """
+        Like run(), but decodes a binary file object incrementally and stores it in batches
+        of `batch_size` trades, so memory stays flat however large the file is. The parse
+        cache is bypassed; duplicates are dropped per batch and by the database.
+        Returns counts: {"parsed", "incomplete", "inserted", "skipped"}.
+        """
+        source = self.sources[source_name or self.source_for(file_name).name]
+        trades_iter = source.iter_decode(stream, file_name)
+        saved_at = datetime.now().isoformat()
+        totals = {"parsed": 0, "incomplete": 0, "inserted": 0, "skipped": 0}
+        while True:
+            with self._timed("decode", [0]) as counter:
+                trades = list(islice(trades_iter, self.batch_size))
+                counter[0] = len(trades)
+            if not trades:
+                break
+            records = self.normalize(trades, saved_at=saved_at)
+            totals["parsed"] += len(trades)
+            totals["incomplete"] += len(self.validate(trades))
+            stored = self.store(records)
+            totals["inserted"] += stored["inserted"]
+            totals["skipped"] += stored["skipped"]
+        return totals
+
+
+# ─── WORKER ENTRY POINT ────────────────────────────────────────────────────────
+
+_worker_pipeline = None
+
+
+def prepare_file(path, saved_at=None):
+    """
+    Decode, normalize and validate one file; meant to run in a worker process (one
+    pipeline per process). Returns (path, bytes read, prepare() result or None, error
+    message or None, seconds spent per stage). Unexpected exceptions are returned as the
+    file's error too, so one bad file can't take down a whole batch.
+    """
+    global _worker_pipeline
+    if _worker_pipeline is None:
+        _worker_pipeline = IngestionPipeline()
+    pipeline = _worker_pipeline
+    before = dict(pipeline.stage_seconds)
+
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+        prepared = pipeline.prepare(data, path, saved_at=saved_at)
+        error = None
+    except (OSError, IngestError) as e:
+        data, prepared, error = b"", None, str(e)
+    except Exception as e:
+        data, prepared, error = b"", None, f"{type(e).__name__}: {e}"
+
+    seconds = {stage: pipeline.stage_seconds[stage] - before[stage] for stage in before}
+    return path, len(data), prepared, error, seconds
+
+
+# ─── FOLLOW MODE ───────────────────────────────────────────────────────────────
+
+class TradeLogFollower:
+    """
+    Incrementally ingests an append-only broker TXT log. Each poll reads only the bytes
+    added since the checkpoint stored in the database, ingests the blocks that are complete
+    (followed by a blank line) and moves the checkpoint past them.
+
+    A trailing block with no blank line after it may still be being written, so it is held
+    back until it is followed by a blank line, or until the file has been quiet for
+    `settle_seconds` and the block already has every expected field. A file that shrinks
+    or is replaced (different inode) is read again from the start; the fingerprint index
+    keeps re-read trades from being duplicated.
+    """
+
+    def __init__(self, path, pipeline=None, settle_seconds=5.0, max_read_bytes=64 * 1024 * 1024):
+        self.path = os.path.abspath(path)
+        self.pipeline = pipeline or IngestionPipeline(sources=(TxtSource(),))
+        self.settle_seconds = settle_seconds
+        self.max_read_bytes = max_read_bytes
+
+    def _file_id(self, stat):
+        return f"{stat.st_dev}:{stat.st_ino}"
+
+    def poll(self) -> dict:
+        """
+        Ingest whatever complete blocks were appended since the last poll.
+        Returns {"parsed", "inserted", "skipped", "offset"}.
+        """
+        counts = {"parsed": 0, "inserted": 0, "skipped": 0}
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return {**counts, "offset": 0}
+
+        file_id = self._file_id(stat)
+        saved_id, offset = get_checkpoint(self.path)
+        if saved_id != file_id or stat.st_size < offset:
+            offset = 0
+
+        if stat.st_size == offset:
+            return {**counts, "offset": offset}
+
+        with open(self.path, 'rb') as f:
+            f.seek(offset)
+            data = f.read(min(stat.st_size - offset, self.max_read_bytes))
+
+        consumed = last_block_boundary(data)
+        if consumed is None:
+            consumed = 0
+        tail = data[consumed:]
+        if tail.strip() and offset + len(data) == stat.st_size and self._tail_settled(stat, tail):
+            consumed = len(data)
+
+        if consumed:
+            prepared = self.pipeline.prepare(data[:consumed], self.path, source_name="txt")
+            stored = self.pipeline.store(prepared["records"])
+            counts["parsed"] = prepared["parsed"]
+            counts.update(stored)
+            offset += consumed
+            set_checkpoint(self.path, file_id, offset)
+
+        return {**counts, "offset": offset}
+
+    def _tail_settled(self, stat, tail):
+        """
+        True when a trailing block without a blank line after it can be taken as finished.
+        """
+        if time.time() - stat.st_mtime < self.settle_seconds:
+            return False
+        trades = parse_trade_text(tail)
+        return len(trades) == 1 and not self.pipeline.missing_fields(trades[0])
+
+    def run(self, interval=1.0, log=print):
+        """
+        Poll every `interval` seconds until interrupted.
+        """
+        while True:
+            counts = self.poll()
+            if counts["parsed"]:
+                log(
+                    f"{self.path}: {counts['parsed']} new trade(s), {counts['inserted']} inserted, "
+                    f"{counts['skipped']} skipped (offset {counts['offset']})"
+                )
+            time.sleep(interval)
+
+
+# ─── DIRECTORY WATCHER ─────────────────────────────────────────────────────────
+
+class DirectoryWatcher:
+    """
+    Watches a drop folder for new TXT/JSON exports and imports them.
+
+    The folder is scanned every poll. A new or changed file only counts once nothing in the
+    folder has changed for `debounce_seconds`, so a burst of copies is imported as one
+    batch: the files are parsed on a process pool and all their records are committed
+    together through the pipeline's batched persist stage. Every imported file goes into the
+    import manifest (by path/size/mtime and by content hash), so it is never parsed twice,
+    even if it is copied in again under another name.
+
+    A file that fails to parse is logged and recorded in the manifest with its error, so it
+    is skipped until it changes. If a batch can't be stored (e.g. the database stays
+    locked), nothing is recorded and the whole batch is retried on the next poll.
+    """
+
+    def __init__(self, directory, pipeline=None, workers=None, debounce_seconds=2.0):
+        self.directory = os.path.abspath(directory)
+        self.pipeline = pipeline or IngestionPipeline()
+        self.workers = workers or os.cpu_count() or 1
+        self.debounce_seconds = debounce_seconds
+        self.extensions = {ext for source in self.pipeline.sources.values() for ext in source.extensions}
+        self._seen = {}
+        self._pending = set()
+        self._last_change = 0.0
+
+    def scan(self):
+        """
+        Return {path: (size, mtime_ns)} for every importable file under the folder.
+        """
+        found = {}
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                if os.path.splitext(name)[1].lower() not in self.extensions:
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                found[path] = (stat.st_size, stat.st_mtime_ns)
+        return found
+
+    def poll(self, pool=None) -> dict:
+        """
+        Scan once; if the folder has settled, import every pending file as one batch.
+        Returns the batch summary, or None when nothing was imported.
+        """
+        now = time.monotonic()
+        for path, signature in self.scan().items():
+            if self._seen.get(path) == signature:
+                continue
+            self._seen[path] = signature
+            if not is_imported(path, *signature):
+                self._pending.add(path)
+            self._last_change = now
+
+        if not self._pending or now - self._last_change < self.debounce_seconds:
+            return None
+
+        batch = sorted(self._pending)
+        summary = self.import_batch(batch, pool)
+        # Only now: if import_batch raised, the batch is still pending for the next poll
+        self._pending.difference_update(batch)
+        return summary
+
+    def import_batch(self, paths, pool=None) -> dict:
+        """
+        Parse `paths` (on `pool` if given) and commit all their trades in batched
+        transactions, then record the files in the import manifest, failed ones with their
+        error. The summary's "errors" lists (path, message) for every file that failed.
+        """
+        errors = []
+        hashes = {}
+        for path in paths:
+            try:
+                with open(path, 'rb') as f:
+                    hashes[path] = hashlib.sha256(f.read()).hexdigest()
+            except OSError as e:
+                # Not recorded: there is no content hash to key it by, so it is tried again
+                # once it shows up with a new size or mtime
+                errors.append((path, str(e)))
+        known = imported_hashes(hashes.values())
+        todo = []
+        for path, digest in hashes.items():
+            if digest not in known:
+                known.add(digest)
+                todo.append(path)
+
+        summary = {"files": len(todo), "duplicates": len(hashes) - len(todo), "failed": 0,
+                   "parsed": 0, "inserted": 0, "skipped": 0, "errors": errors}
+        saved_at = datetime.now().isoformat()
+        if pool is not None and len(todo) > 1:
+            results = pool.map(prepare_file, todo, [saved_at] * len(todo))
+        else:
+            results = (prepare_file(path, saved_at) for path in todo)
+
+        records = []
+        manifest = []
+        for path, size, prepared, error, _ in results:
+            size, mtime_ns = self._seen.get(path, (size, 0))
+            entry = {"sha256": hashes[path], "path": path, "size": size, "mtime_ns": mtime_ns,
+                     "parsed": 0, "error": error}
+            manifest.append(entry)
+            if error is not None:
+                errors.append((path, error))
+                continue
+            records.extend(prepared["records"])
+            summary["parsed"] += prepared["parsed"]
+            entry["parsed"] = prepared["parsed"]
+
+        stored = self.pipeline.store(records)
+        summary["inserted"] = stored["inserted"]
+        summary["skipped"] = stored["skipped"]
+        record_imports(manifest)
+        summary["failed"] = len(errors)
+        return summary
+
+    def run(self, interval=1.0, log=print):
+        """
+        Poll every `interval` seconds until interrupted, parsing on a process pool. A poll
+        that fails is logged and retried on the next one; it never stops the watcher.
+        """
+        pool = ProcessPoolExecutor(max_workers=self.workers)
+        try:
+            while True:
+                try:
+                    summary = self.poll(pool)
+                except BrokenProcessPool as e:
+                    log(f"{self.directory}: parser pool broke ({e}); restarting it")
+                    pool.shutdown(wait=False)
+                    pool = ProcessPoolExecutor(max_workers=self.workers)
+                    summary = None
+                except Exception as e:
+                    log(f"{self.directory}: import failed, will retry: {type(e).__name__}: {e}")
+                    summary = None
+                if summary is not None:
+                    for path, error in summary["errors"]:
+                        log(f"FAILED {path}: {error}")
+                    log(
+                        f"{self.directory}: {summary['files']} file(s) imported "
+                        f"({summary['duplicates']} already seen, {summary['failed']} failed): "
+                        f"{summary['parsed']} parsed, {summary['inserted']} inserted, "
+                        f"{summary['skipped']} skipped"
+                    )
+                time.sleep(interval)
+        finally:
+            pool.shutdown()
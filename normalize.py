@@ -0,0 +1,243 @@
+import hashlib
+import re
+from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+
+# A dollar amount such as "$94.00", "-$1,204.50" or "($3.10)"
+_MONEY = re.compile(r'(\()?\s*(-)?\s*\$?\s*(\d[\d,]*(?:\.\d+)?|\.\d+)')
+
+# "2 contracts at $0.47", "10 shares at $123.45", "0.5 shares at $80"
+_QUANTITY_PRICE = re.compile(r'^\s*([\d,]*\.?\d+)\s+([A-Za-z]+)\s+at\s+(.+)$')
+
+# Ticker right after the side in a header, e.g. "SPY" in "Buy SPY $645 Call 7/31"
+_UNDERLYING = re.compile(r'^\s*[A-Za-z]+\s+([A-Za-z][A-Za-z0-9.\-]*)')
+
+# Option order header: side, underlying, strike, right and expiry, e.g.
+# "Buy SPY $645 Call 7/31", "Sell QQQ $560.50 Put 8/15/2025", "Buy TSLA 250 Calls 1/16/26"
+_OPTION_HEADER = re.compile(
+    r'^\s*(buy|sell)\s+([A-Za-z][A-Za-z0-9.\-]*)\s+\$?([\d,]*\.?\d+)\s+(call|put)s?'
+    r'\s+(\d{1,2})/(\d{1,2})(?:/(\d{2}|\d{4}))?\s*$',
+    re.IGNORECASE,
+)
+
+# Leading order side of any header
+_SIDE = re.compile(r'^\s*(buy|sell)\b', re.IGNORECASE)
+
+# Distinct headers whose decoding is memoized; a journal repeats the same contracts a lot
+HEADER_CACHE_SIZE = 4096
+
+# Trailing time zone abbreviation, e.g. "... 9:31 AM EDT"
+_TZ_SUFFIX = re.compile(r'\s+([A-Z]{2,4})$')
+
+_TZ_OFFSETS = {
+    "UTC": 0, "GMT": 0,
+    "EST": -5, "EDT": -4,
+    "CST": -6, "CDT": -5,
+    "MST": -7, "MDT": -6,
+    "PST": -8, "PDT": -7,
+}
+
+_TIMESTAMP_FORMATS = [
+    "%m/%d/%Y, %I:%M:%S %p",
+    "%m/%d/%Y, %I:%M %p",
+    "%m/%d/%Y %I:%M:%S %p",
+    "%m/%d/%Y %I:%M %p",
+    "%b %d, %Y %I:%M:%S %p",
+    "%b %d, %Y %I:%M %p",
+    "%b %d, %Y at %I:%M %p",
+    "%Y-%m-%dT%H:%M:%S",
+    "%Y-%m-%d %H:%M:%S",
+    "%m/%d/%Y",
+    "%b %d, %Y",
+]
+
+# Typed columns derived from the raw text fields, with their SQLite types
+TYPED_COLUMNS = {
+    "total_cost_cents": "INTEGER",
+    "qty": "REAL",
+    "qty_unit": "TEXT",
+    "price_cents": "INTEGER",
+    "limit_price_cents": "INTEGER",
+    "est_cost_cents": "INTEGER",
+    "est_reg_fees_cents": "INTEGER",
+    "submitted_ts": "INTEGER",
+    "filled_ts": "INTEGER",
+    "underlying": "TEXT",
+    "fingerprint": "TEXT",
+    "side": "TEXT",
+    "strike_cents": "INTEGER",
+    "option_right": "TEXT",
+    "expiry": "TEXT",
+}
+
+# Fields that identify one execution; the same fill imported twice has the same values
+FINGERPRINT_COLUMNS = ["header", "account", "submitted", "filled", "quantity", "quantity_price"]
+
+
+def parse_cents(text):
+    """
+    Turns a currency string ("$94.00", "-$1,204.50", "($3.10)") into integer cents.
+    Returns None when the text holds no amount.
+    """
+    if not text:
+        return None
+    match = _MONEY.search(text)
+    if match is None:
+        return None
+
+    paren, minus, digits = match.groups()
+    try:
+        amount = Decimal(digits.replace(",", ""))
+    except InvalidOperation:
+        return None
+
+    cents = int((amount * 100).quantize(Decimal("1"), rounding=ROUND_HALF_UP))
+    return -cents if (paren or minus) else cents
+
+
+def parse_quantity_price(text):
+    """
+    Splits "2 contracts at $0.47" into (2, "contracts", 47) — quantity, unit and unit price
+    in cents. Missing parts come back as None.
+    """
+    if not text:
+        return None, None, None
+    match = _QUANTITY_PRICE.match(text)
+    if match is None:
+        return None, None, None
+
+    qty_text, unit, price_text = match.groups()
+    qty = float(qty_text.replace(",", ""))
+    return qty, unit.lower(), parse_cents(price_text)
+
+
+def parse_timestamp(text):
+    """
+    Converts a broker timestamp such as "7/28/2025, 9:31:05 AM EDT" into epoch seconds.
+    A US time zone abbreviation is honoured; without one the time is read as local time.
+    Returns None when the text matches none of the known formats.
+    """
+    if not text:
+        return None
+
+    text = text.strip()
+    tz = None
+    match = _TZ_SUFFIX.search(text)
+    if match and match.group(1) in _TZ_OFFSETS:
+        tz = timezone(timedelta(hours=_TZ_OFFSETS[match.group(1)]))
+        text = text[:match.start()]
+
+    for fmt in _TIMESTAMP_FORMATS:
+        try:
+            parsed = datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+        if tz is not None:
+            parsed = parsed.replace(tzinfo=tz)
+        return int(parsed.timestamp())
+
+    return None
+
+
+def parse_underlying(header):
+    """
+    Pulls the underlying symbol out of a trade header ("Buy SPY $645 Call 7/31" → "SPY").
+    Returns None when the header doesn't start with a side and a symbol.
+    """
+    return decode_header(header)[1]
+
+
+@lru_cache(maxsize=HEADER_CACHE_SIZE)
+def decode_header(header):
+    """
+    Splits a trade header into (side, underlying, strike in cents, right, expiry month,
+    expiry day, expiry year): "Buy SPY $645 Call 7/31" → ("buy", "SPY", 64500, "call", 7,
+    31, None). The year is only set when the header has one; see option_expiry. Headers
+    that aren't option orders keep the side and underlying they have and None elsewhere.
+    Memoized, since the same contract recurs across fills.
+    """
+    if not header:
+        return None, None, None, None, None, None, None
+
+    match = _OPTION_HEADER.match(header)
+    if match is None:
+        side = _SIDE.match(header)
+        underlying = _UNDERLYING.match(header)
+        return (
+            side.group(1).lower() if side else None,
+            underlying.group(1).upper() if underlying else None,
+            None, None, None, None, None,
+        )
+
+    side, underlying, strike, right, month, day, year = match.groups()
+    if year is not None:
+        year = int(year) + (2000 if len(year) == 2 else 0)
+    return (
+        side.lower(), underlying.upper(), parse_cents(strike), right.lower(),
+        int(month), int(day), year,
+    )
+
+
+def option_expiry(month, day, year=None, traded_ts=None):
+    """
+    ISO date ("2025-07-31") of an option's expiry. Headers usually leave the year out; it
+    is then the first year in which the expiry falls on or after the trade date
+    (`traded_ts`, epoch seconds), since an expired contract can't trade. Returns None
+    when the date is invalid or the year can't be inferred.
+    """
+    if month is None or day is None:
+        return None
+    try:
+        if year is not None:
+            return date(year, month, day).isoformat()
+        if traded_ts is None:
+            return None
+        traded = datetime.fromtimestamp(traded_ts, timezone.utc).date()
+        expiry = date(traded.year, month, day)
+        if expiry < traded:
+            expiry = date(traded.year + 1, month, day)
+        return expiry.isoformat()
+    except ValueError:
+        return None
+
+
+def trade_fingerprint(record):
+    """
+    Canonical SHA-256 fingerprint of a trade record (keyed by database column names) built
+    from FINGERPRINT_COLUMNS, with whitespace collapsed, so re-importing the same broker
+    export yields the same value.
+    """
+    parts = [" ".join(str(record.get(col) or "").split()) for col in FINGERPRINT_COLUMNS]
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+def normalize_record(record):
+    """
+    Returns the typed columns (see TYPED_COLUMNS) for one trade record keyed by database
+    column names, so sums and ranges can be computed in SQL instead of re-parsing strings.
+    """
+    qty, qty_unit, price_cents = parse_quantity_price(record.get("quantity_price"))
+    header = decode_header(record.get("header"))
+    side, underlying, strike_cents, option_right, month, day, year = header
+    submitted_ts = parse_timestamp(record.get("submitted"))
+    filled_ts = parse_timestamp(record.get("filled"))
+    return {
+        "total_cost_cents": parse_cents(record.get("total_cost")),
+        "qty": qty,
+        "qty_unit": qty_unit,
+        "price_cents": price_cents,
+        "limit_price_cents": parse_cents(record.get("limit_price")),
+        "est_cost_cents": parse_cents(record.get("est_cost")),
+        "est_reg_fees_cents": parse_cents(record.get("est_reg_fees")),
+        "submitted_ts": submitted_ts,
+        "filled_ts": filled_ts,
+        "underlying": underlying,
+        "fingerprint": trade_fingerprint(record),
+        "side": side,
+        "strike_cents": strike_cents,
+        "option_right": option_right,
+        "expiry": option_expiry(
+            month, day, year, submitted_ts if submitted_ts is not None else filled_ts
+        ),
+    }
@@ -0,0 +1,68 @@
+import pytest
+
+import database
+
+ACCOUNTS = ["Individual", "Roth IRA", "Joint"]
+
+
+@pytest.fixture
+def journal(tmp_path, monkeypatch):
+    """
+    A fresh database of 25 trades: 20 saved in one bulk import (one shared saved_at), the
+    rest one at a time, spread over three accounts.
+    """
+    monkeypatch.setattr(database, "DB_PATH", tmp_path / "trades.db")
+    database.init_db()
+    records = []
+    for i in range(25):
+        record = dict.fromkeys(database.RECORD_COLUMNS, "")
+        record.update(
+            header=f"Buy SPY ${600 + i} Call 7/31",
+            account=ACCOUNTS[i % len(ACCOUNTS)],
+            saved_at="2025-07-28T10:00:00" if i < 20 else f"2025-07-2{i - 20}T09:00:00",
+        )
+        records.append(record)
+    # Shuffled ids, so id order within the tied saved_at differs from insert order
+    records = records[::2] + records[1::2]
+    assert database.insert_trades(records).inserted == 25
+    return records
+
+
+def _expected_ids(filters):
+    sql = "SELECT id FROM trades"
+    params = []
+    if filters:
+        sql += f" WHERE account IN ({', '.join('?' * len(filters['account']))})"
+        params = filters["account"]
+    with database.connection() as conn:
+        return [row[0] for row in conn.execute(sql + " ORDER BY saved_at DESC, id DESC", params)]
+
+
+def _walk(fetch_page, limit, filters):
+    ids = []
+    cursor = None
+    while True:
+        page, cursor = fetch_page(limit, cursor, filters)
+        assert len(page) <= limit
+        ids.extend(page)
+        if cursor is None:
+            return ids
+
+
+def _fetch_trades(limit, cursor, filters):
+    trades, cursor = database.fetch_trades(limit, cursor, filters)
+    return [trade["id"] for trade in trades], cursor
+
+
+def _fetch_trade_columns(limit, cursor, filters):
+    columns, cursor = database.fetch_trade_columns(["id", "header"], limit, cursor, filters)
+    return columns["id"], cursor
+
+
+@pytest.mark.parametrize("fetch_page", [_fetch_trades, _fetch_trade_columns])
+@pytest.mark.parametrize("filters", [None, {"account": ["Individual", "Joint"]}])
+@pytest.mark.parametrize("limit", [1, 2, 3, 7, 50])
+def test_pages_cover_every_row_once(journal, fetch_page, filters, limit):
+    ids = _walk(fetch_page, limit, filters)
+    assert len(ids) == len(set(ids))
+    assert ids == _expected_ids(filters)
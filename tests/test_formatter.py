@@ -0,0 +1,53 @@
+import pytest
+
+from formatter import (
+    iter_trades_mmap, parse_trade_file, parse_trade_file_parallel, parse_trade_text,
+)
+
+BLOCKS = [
+    "Buy SPY $645 Call 7/31\n$94.00\n2 contracts at $0.47\nIndividual · Jul 28\n"
+    "Type\nLimit buy\nSubmitted\n7/28/2025, 9:31:05 AM EDT\nAccount\nIndividual\n",
+    "Sell QQQ $560 Put 8/15\n$120.00\n3 contracts at $0.40\n"
+    "Type\nLimit sell\nSubmitted\n7/28/2025, 10:02:00 AM EDT\nAccount\nRoth IRA\n",
+    "Buy TSLA $250 Call 1/16\n$310.00\n1 contract at $3.10\n"
+    "Type\nLimit buy\nStatus\nFilled\n",
+]
+
+# name → (file contents, trades the serial parser finds)
+CASES = {
+    "blank lines": ("\n".join(BLOCKS), 3),
+    "whitespace lines": ("   \n".join(BLOCKS), 3),
+    "nbsp separator": ("\u00a0\n".join(BLOCKS), 3),
+    "line separator": ("\u2028\n".join(BLOCKS), 3),
+    "crlf": ("\n".join(BLOCKS).replace("\n", "\r\n"), 3),
+    "cr only": ("\n".join(BLOCKS).replace("\n", "\r"), 3),
+    "mixed": (BLOCKS[0] + "\u00a0\n" + BLOCKS[1] + "\n" + BLOCKS[2].replace("\n", "\r"), 3),
+    "empty": ("", 0),
+}
+
+
+@pytest.fixture(params=sorted(CASES))
+def export(request, tmp_path):
+    text, expected = CASES[request.param]
+    path = tmp_path / "export.txt"
+    path.write_bytes(text.encode("utf-8"))
+    return path, text, expected
+
+
+def test_serial_parsers_agree(export):
+    path, text, expected = export
+    trades = parse_trade_file(path)
+    assert len(trades) == expected
+    assert parse_trade_text(text) == trades
+    assert parse_trade_text(text.encode("utf-8")) == trades
+
+
+def test_mmap_matches_serial(export):
+    path, _, _ = export
+    assert list(iter_trades_mmap(path)) == parse_trade_file(path)
+
+
+@pytest.mark.parametrize("workers", [1, 2, 3, 8])
+def test_parallel_matches_serial(export, workers):
+    path, _, _ = export
+    assert parse_trade_file_parallel(path, workers=workers) == parse_trade_file(path)
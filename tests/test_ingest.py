@@ -0,0 +1,122 @@
+import io
+import json
+import random
+
+import pytest
+
+from ingest import IngestError, IngestionPipeline, JsonSource, field_values, iter_json_trades
+
+TRADE = {
+    "header": "Buy SPY $645 Call 7/31",
+    "Total Cost": "$94.00",
+    "Quantity + Price": "2 contracts at $0.47",
+    "Filled": None,
+}
+
+
+def test_null_field_is_empty():
+    assert field_values(TRADE)["filled"] == ""
+
+
+def test_grid_cells_store_like_to_record():
+    # A grid save passes every cell back as an override; it must store the same record
+    # (and so the same fingerprint) as saving the parsed trade directly
+    pipeline = IngestionPipeline()
+    direct = pipeline.to_record(TRADE, saved_at="2025-07-28T10:00:00")
+    via_grid = pipeline.to_record({}, overrides=field_values(TRADE), saved_at="2025-07-28T10:00:00")
+    assert via_grid == direct
+
+
+def _random_value(rng, depth=0):
+    kind = rng.choice("snfbzlo" if depth < 3 else "snfbz")
+    if kind == "s":
+        # ASCII, escapes, multibyte and astral characters, so chunks split them all
+        return "".join(rng.choice(['a', ' ', '"', '\\', '\n', 'é', '€', '\u2028', '😀'])
+                       for _ in range(rng.randrange(12)))
+    if kind == "n":
+        return rng.randrange(-10**12, 10**12)
+    if kind == "f":
+        return rng.uniform(-1e6, 1e6)
+    if kind == "b":
+        return rng.random() < 0.5
+    if kind == "z":
+        return None
+    if kind == "l":
+        return [_random_value(rng, depth + 1) for _ in range(rng.randrange(4))]
+    return _random_object(rng, depth + 1)
+
+
+def _random_object(rng, depth=0):
+    return {f"k{i}é": _random_value(rng, depth) for i in range(rng.randrange(5))}
+
+
+def _random_documents(count, seed=20):
+    rng = random.Random(seed)
+    for _ in range(count):
+        if rng.random() < 0.2:
+            doc = _random_object(rng)
+        else:
+            doc = [_random_object(rng) for _ in range(rng.randrange(6))]
+        # Vary the layout too: compact, indented, \u escapes or raw UTF-8
+        text = json.dumps(doc, indent=rng.choice([None, 1]), ensure_ascii=rng.random() < 0.5)
+        yield text.encode("utf-8")
+
+
+def _decode(data, chunk_size):
+    return list(iter_json_trades(io.BytesIO(data), chunk_size=chunk_size))
+
+
+def _expected(data):
+    doc = json.loads(data.decode("utf-8-sig"))
+    return doc if isinstance(doc, list) else [doc]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 5, 7, 16, 64])
+def test_streaming_matches_json_loads(chunk_size):
+    for data in _random_documents(300):
+        assert _decode(data, chunk_size) == _expected(data)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 4, 64])
+def test_utf8_bom(chunk_size):
+    data = b"\xef\xbb\xbf" + json.dumps([{"a": "é€😀"}, {"b": 1}], ensure_ascii=False).encode()
+    assert _decode(data, chunk_size) == [{"a": "é€😀"}, {"b": 1}]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 4, 64])
+@pytest.mark.parametrize("data, message", [
+    (b'[{"a": 1},]', "Expecting value at byte 10"),
+    (b'[{"a": 1}, ]', "Expecting value at byte 11"),
+    (b'[{"a": 1}', "unterminated array at byte 9"),
+    (b'[{"a": 1}, {"b": ', "Expecting value at byte 17"),
+    (b'[{"a": 1}] []', "extra data after array at byte 11"),
+    (b'{"a": 1} {"b": 2}', "extra data at byte 9"),
+    (b'[{"a": 1} {"b": 2}]', "expected ',' or ']' at byte 10"),
+    (b'"trade"', "document is not a JSON object or array"),
+    (b"", "empty document"),
+])
+def test_malformed_documents(data, message, chunk_size):
+    with pytest.raises(ValueError, match=message):
+        _decode(data, chunk_size)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 64])
+def test_error_offsets_count_bytes(chunk_size):
+    # The BOM and the two-byte "é" both count towards the reported offset
+    data = b"\xef\xbb\xbf" + '[{"a": "é"}] x'.encode("utf-8")
+    with pytest.raises(ValueError, match="at byte 17"):
+        _decode(data, chunk_size)
+
+
+def test_oversized_element():
+    data = json.dumps([{"a": "x" * 1000}]).encode()
+    with pytest.raises(ValueError, match="larger than 100 bytes"):
+        list(iter_json_trades(io.BytesIO(data), chunk_size=16, max_element_bytes=100))
+
+
+def test_non_object_element_is_an_ingest_error():
+    data = b'[{"header": "Buy SPY $645 Call 7/31"}, "oops"]'
+    with pytest.raises(IngestError, match="Element 1 of a.json is not a JSON object"):
+        list(JsonSource().iter_decode(io.BytesIO(data), "a.json"))
+    with pytest.raises(IngestError, match="Element 1 of a.json is not a JSON object"):
+        JsonSource().decode(data, "a.json")
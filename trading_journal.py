@@ -1,103 +1,253 @@
 # app.py
 
 import streamlit as st
-import sqlite3
-import json
-import tempfile
+import html
+import math
 from datetime import datetime
-from pathlib import Path
 
-# ─── IMPORT THE PARSER FROM formatter.py ────────────────────────────────────────
-from formatter import parse_trade_file
+# ─── IMPORT THE DATABASE LAYER FROM database.py ─────────────────────────────────
+from database import (
+    init_db, fetch_trade_columns, distinct_values, get_data_version, search_trades,
+    HIGHLIGHT_START, HIGHLIGHT_END,
+)
 
-# ─── CONSTANTS ─────────────────────────────────────────────────────────────────
+# ─── IMPORT THE INGESTION PIPELINE FROM ingest.py ───────────────────────────────
+# (TXT files go through parse_trade_file from formatter.py inside the pipeline)
+from ingest import FIELD_COLUMNS, IngestError, IngestionPipeline, ParseCache, field_values
 
-DB_PATH = Path("trades.db")   # SQLite file in the same folder as app.py
+# ─── IMPORT THE PARQUET EXPORT FROM export_trades.py ────────────────────────────
+from export_trades import export_parquet_zip
 
-# ─── DATABASE SETUP ────────────────────────────────────────────────────────────
+# ─── STREAMLIT APP LAYOUT ───────────────────────────────────────────────────────
 
-def init_db():
+st.set_page_config(page_title="Trade Journal Dashboard", layout="wide")
+st.title("📔 Trade Journal Dashboard")
+
+# Initialize the DB once per server process rather than on every rerun
+@st.cache_resource
+def _init_database():
+    init_db()
+    return True
+
+_init_database()
+
+# ─── CACHED READS ──────────────────────────────────────────────────────────────
+# `data_version` is bumped by every write to the trades table, so it only serves as part of
+# the cache key: reruns reuse the cached result until the table actually changes.
+
+# Saved-trades table: database column → display label, in display order (every column is
+# shown for verification)
+SAVED_TRADE_COLUMNS = {
+    "saved_at": "Saved At",
+    "header": "Header",
+    "underlying": "Ticker",
+    "expiry": "Expiry",
+    "total_cost": "Total Cost",
+    "quantity_price": "Quantity+Price",
+    "type": "Type",
+    "position_effect": "Position effect",
+    "time_in_force": "Time in force",
+    "submitted": "Submitted",
+    "quantity": "Quantity",
+    "account": "Account",
+    "status": "Status",
+    "filled_quantity": "Filled qty",
+    "filled": "Filled",
+    "limit_price": "Limit price",
+    "est_cost": "Est cost",
+    "est_reg_fees": "Est reg fees",
+    "suggestion": "Suggestion",
+    "comment": "Comment",
+}
+
+@st.cache_data(max_entries=64)
+def load_saved_trades_page(data_version, page_size, cursor, filters):
     """
-    Create the trades table if it doesn’t already exist.
+    Return (DataFrame of one page of saved trades, cursor of the next page). The page comes
+    back from the database as one list per column, already keyed by display label, so the
+    frame is built in a single columnar step.
     """
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute(
-        """
-        CREATE TABLE IF NOT EXISTS trades (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            header TEXT,
-            total_cost TEXT,
-            quantity_price TEXT,
-            type TEXT,
-            position_effect TEXT,
-            time_in_force TEXT,
-            submitted TEXT,
-            quantity TEXT,
-            account TEXT,
-            status TEXT,
-            filled_quantity TEXT,
-            filled TEXT,
-            limit_price TEXT,
-            est_cost TEXT,
-            est_reg_fees TEXT,
-            suggestion TEXT,
-            comment TEXT,
-            saved_at TEXT
-        )
-        """
+    from pandas import DataFrame
+
+    columns, next_cursor = fetch_trade_columns(
+        SAVED_TRADE_COLUMNS, limit=page_size, after_cursor=cursor, filters=filters
     )
-    conn.commit()
-    conn.close()
+    return DataFrame(columns, columns=list(SAVED_TRADE_COLUMNS.values())), next_cursor
+
+@st.cache_data(max_entries=16)
+def load_filter_values(data_version, column):
+    return distinct_values(column)
+
+@st.cache_data(max_entries=64)
+def load_search_results(data_version, text):
+    return search_trades(text)
+
+# ─── TRADE EDITOR HELPERS ──────────────────────────────────────────────────────
+# Only one page of trades per uploaded file gets widgets. Streamlit forgets the state of
+# widgets that were not drawn on the previous run, so editor values are re-assigned to
+# session_state at the top of every run; edits survive moving between pages.
+
+EDITOR_KEY_MARKERS = ("_json_trade", "_txt_trade")
+
+for _key in list(st.session_state.keys()):
+    if any(marker in _key for marker in EDITOR_KEY_MARKERS):
+        st.session_state[_key] = st.session_state[_key]
 
-def insert_trade(record: dict):
+def _field_input(label, default, key):
     """
-    Insert one trade record (including suggestion/comment) into the database.
-    Keys in `record` must exactly match the column names (except id).
+    A text_input that takes `default` only the first time it is drawn; afterwards the value
+    kept in session_state wins (passing both makes Streamlit warn).
     """
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute(
-        """
-        INSERT INTO trades (
-            header, total_cost, quantity_price, type, position_effect,
-            time_in_force, submitted, quantity, account, status,
-            filled_quantity, filled, limit_price, est_cost, est_reg_fees,
-            suggestion, comment, saved_at
-        ) VALUES (
-            :header, :total_cost, :quantity_price, :type, :position_effect,
-            :time_in_force, :submitted, :quantity, :account, :status,
-            :filled_quantity, :filled, :limit_price, :est_cost, :est_reg_fees,
-            :suggestion, :comment, :saved_at
+    if key in st.session_state:
+        return st.text_input(label, key=key)
+    return st.text_input(label, value=default, key=key)
+
+def _trade_page(total, key):
+    """
+    Draw the page-size and page controls for a file with `total` trades and return the
+    (start, stop) slice of trades to render.
+    """
+    def _first_page():
+        st.session_state[f"{key}_page"] = 1
+
+    size_col, page_col, info_col = st.columns([1, 1, 2])
+    with size_col:
+        page_size = st.selectbox(
+            "Trades per page", options=[5, 10, 25, 50], index=1,
+            key=f"{key}_page_size", on_change=_first_page,
         )
-        """,
-        record
+    pages = max(1, math.ceil(total / page_size))
+    with page_col:
+        # Like _field_input: once _first_page has set the page through session_state,
+        # passing value=1 as well makes Streamlit warn
+        page_kwargs = {} if f"{key}_page" in st.session_state else {"value": 1}
+        page = st.number_input(
+            "Page", min_value=1, max_value=pages, step=1, key=f"{key}_page", **page_kwargs
+        )
+    start = (page - 1) * page_size
+    stop = min(start + page_size, total)
+    with info_col:
+        st.caption(f"Showing trades {start + 1}–{stop} of {total} ({pages} page(s))")
+    return start, stop
+
+# Editor widgets: (label, trade field, widget key prefix); the first 7 go in the left column
+EDITOR_FIELDS = [
+    ("Header", "header", "hdr"),
+    ("Total Cost", "Total Cost", "tc"),
+    ("Quantity + Price", "Quantity + Price", "qp"),
+    ("Type", "Type", "type"),
+    ("Position effect", "Position effect", "peff"),
+    ("Time in force", "Time in force", "tif"),
+    ("Submitted", "Submitted", "sub"),
+    ("Quantity", "Quantity", "qty"),
+    ("Account", "Account", "acct"),
+    ("Status", "Status", "stat"),
+    ("Filled quantity", "Filled quantity", "fq"),
+    ("Filled", "Filled", "filled"),
+    ("Limit price", "Limit price", "lp"),
+    ("Est cost", "Est cost", "ec"),
+    ("Est regulatory fees", "Est regulatory fees", "erf"),
+]
+
+def _grid_rows(file_name, trades_list):
+    """
+    One grid row per parsed trade, keyed by trades column, plus empty suggestion/comment.
+    Cells hold what to_record would store, so a null field stays empty rather than "None".
+    """
+    return [
+        {
+            "file": file_name,
+            "trade_no": idx + 1,
+            **field_values(trade_data),
+            "suggestion": "",
+            "comment": "",
+        }
+        for idx, trade_data in enumerate(trades_list)
+    ]
+
+def _render_trade_form(pipeline, file_name, idx, trade_data, kind, label):
+    """
+    Draw the two-column editor, Suggestion/Comment and Save button for one trade.
+    """
+    st.markdown("---")
+    st.markdown(f"#### File: **{file_name}** | {label}Trade #{idx + 1}")
+
+    missing = pipeline.missing_fields(trade_data)
+    if missing:
+        st.warning(f"{label}Trade #{idx + 1} is missing fields: {', '.join(missing)}")
+
+    col1, col2 = st.columns(2)
+    prefix = f"{file_name}_{kind}_trade{idx}"
+
+    for pos, (field_label, field, key) in enumerate(EDITOR_FIELDS):
+        with col1 if pos < 7 else col2:
+            _field_input(field_label, trade_data.get(field, ""), key=f"{key}_{prefix}")
+
+    suggestion = st.text_area(
+        "Suggestion (e.g., lessons learned, trade improvement ideas)",
+        key=f"sugg_{prefix}"
+    )
+    comment = st.text_area(
+        "Comment (any additional notes you want to store)",
+        key=f"comm_{prefix}"
     )
-    conn.commit()
-    conn.close()
 
-def fetch_all_trades():
+    if st.button(f"Save {label}Trade #{idx + 1} from {file_name}"):
+        # Build record by preferring any edited value in session_state, otherwise fallback to trade_data
+        overrides = {
+            FIELD_COLUMNS[field]: st.session_state.get(f"{key}_{prefix}")
+            for _, field, key in EDITOR_FIELDS
+        }
+        record = pipeline.to_record(trade_data, overrides, suggestion=suggestion, comment=comment)
+        if pipeline.persist([record]).inserted:
+            st.success(f"✅ {label}Trade #{idx + 1} from {file_name} saved to journal.")
+        else:
+            st.info(f"{label}Trade #{idx + 1} from {file_name} is already in the journal; skipped.")
+
+def render_uploads(pipeline, uploaded_files, kind, label):
     """
-    Return a list of all saved trades as dicts (ordered by saved_at DESC).
+    Decode every uploaded file through the pipeline (with the source matching its
+    extension), then either queue its trades for the grid editor or draw one page of
+    per-trade forms. `kind` names the upload section in widget keys.
     """
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute("SELECT * FROM trades ORDER BY saved_at DESC")
-    rows = c.fetchall()
-    colnames = [desc[0] for desc in c.description]
-    conn.close()
-    trade_dicts = []
-    for row in rows:
-        trade_dicts.append({colnames[i]: row[i] for i in range(len(colnames))})
-    return trade_dicts
+    for uploaded in uploaded_files:
+        try:
+            source_name = pipeline.source_for(uploaded.name).name
+            trades_list = pipeline.decode(source_name, uploaded.getvalue(), uploaded.name)
+        except IngestError as e:
+            st.error(f"❌ {e}")
+            continue
 
-# ─── STREAMLIT APP LAYOUT ───────────────────────────────────────────────────────
+        if not trades_list:
+            st.warning(f"No valid trade blocks found in {uploaded.name}.")
+            continue
 
-st.set_page_config(page_title="Trade Journal Dashboard", layout="wide")
-st.title("📔 Trade Journal Dashboard")
+        if editor_mode == "Grid":
+            grid_rows.extend(_grid_rows(uploaded.name, trades_list))
+            continue
+
+        start, stop = _trade_page(len(trades_list), key=f"{uploaded.name}_{kind}")
+        for idx, trade_data in enumerate(trades_list[start:stop], start=start):
+            _render_trade_form(pipeline, uploaded.name, idx, trade_data, kind, label)
+
+    st.divider()
+
+# One parse cache per server process: reruns with the same uploads skip re-parsing them
+@st.cache_resource
+def _parse_cache():
+    return ParseCache()
 
-# Initialize the DB on first run
-init_db()
+pipeline = IngestionPipeline(cache=_parse_cache())
+
+# In grid mode the upload sections only parse; every trade lands in one editable table
+editor_mode = st.radio(
+    "Editing mode",
+    options=["Forms", "Grid"],
+    horizontal=True,
+    key="editor_mode",
+    help="Forms: one editor and Save button per trade. Grid: every uploaded trade in one table with a single “Save all”.",
+)
+grid_rows = []
 
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 # SECTION 1: UPLOAD JSON FILES
@@ -106,100 +256,39 @@ init_db()
 st.header("1. Upload Trade JSON Files")
 uploaded_json = st.file_uploader(
     label="Select one or more trade JSON files",
-    type=["json"],
+    type=["json", "ndjson", "jsonl"],
     accept_multiple_files=True,
-    help="Each JSON should be either a single trade object or a list of trade objects."
+    help="Each JSON should be either a single trade object or a list of trade objects. "
+         "NDJSON (.ndjson/.jsonl, e.g. from `python formatter.py --format ndjson`) holds one trade object per line."
 )
 
-if uploaded_json:
-    for uploaded in uploaded_json:
-        try:
-            raw = uploaded.read().decode("utf-8")
-            parsed_json = json.loads(raw)
-        except Exception as e:
-            st.error(f"❌ Could not parse {uploaded.name} as JSON: {e}")
-            continue
-
-        # Ensure we always have a list of trade‐dicts
-        if isinstance(parsed_json, dict):
-            trades_list = [parsed_json]
-        elif isinstance(parsed_json, list):
-            trades_list = parsed_json
-        else:
-            st.error(f"❌ {uploaded.name} does not contain a JSON object or array.")
-            continue
-
-        expected_keys = {
-            "header", "Total Cost", "Quantity + Price", "Type", "Position effect",
-            "Time in force", "Submitted", "Quantity", "Account", "Status",
-            "Filled quantity", "Filled", "Limit price", "Est cost", "Est regulatory fees"
-        }
-
-        for idx, trade_data in enumerate(trades_list):
-            st.markdown("---")
-            st.markdown(f"#### File: **{uploaded.name}** | Trade #{idx + 1}")
-
-            missing = expected_keys - set(trade_data.keys())
-            if missing:
-                st.warning(f"Trade #{idx + 1} is missing fields: {', '.join(missing)}")
-
-            col1, col2 = st.columns(2)
-            prefix = f"{uploaded.name}_json_trade{idx}"
-
-            with col1:
-                hdr = st.text_input("Header", value=trade_data.get("header", ""), key=f"hdr_{prefix}")
-                tc = st.text_input("Total Cost", value=trade_data.get("Total Cost", ""), key=f"tc_{prefix}")
-                qp = st.text_input("Quantity + Price", value=trade_data.get("Quantity + Price", ""), key=f"qp_{prefix}")
-                tp = st.text_input("Type", value=trade_data.get("Type", ""), key=f"type_{prefix}")
-                peff = st.text_input("Position effect", value=trade_data.get("Position effect", ""), key=f"peff_{prefix}")
-                tif = st.text_input("Time in force", value=trade_data.get("Time in force", ""), key=f"tif_{prefix}")
-                subm = st.text_input("Submitted", value=trade_data.get("Submitted", ""), key=f"sub_{prefix}")
-
-            with col2:
-                qty = st.text_input("Quantity", value=trade_data.get("Quantity", ""), key=f"qty_{prefix}")
-                acct = st.text_input("Account", value=trade_data.get("Account", ""), key=f"acct_{prefix}")
-                stat = st.text_input("Status", value=trade_data.get("Status", ""), key=f"stat_{prefix}")
-                fq = st.text_input("Filled quantity", value=trade_data.get("Filled quantity", ""), key=f"fq_{prefix}")
-                filled_time = st.text_input("Filled", value=trade_data.get("Filled", ""), key=f"filled_{prefix}")
-                lp = st.text_input("Limit price", value=trade_data.get("Limit price", ""), key=f"lp_{prefix}")
-                ec = st.text_input("Est cost", value=trade_data.get("Est cost", ""), key=f"ec_{prefix}")
-                erf = st.text_input("Est regulatory fees", value=trade_data.get("Est regulatory fees", ""), key=f"erf_{prefix}")
-
-            suggestion = st.text_area(
-                "Suggestion (e.g., lessons learned, trade improvement ideas)",
-                key=f"sugg_{prefix}"
-            )
-            comment = st.text_area(
-                "Comment (any additional notes you want to store)",
-                key=f"comm_{prefix}"
-            )
-
-            if st.button(f"Save JSON Trade #{idx + 1} from {uploaded.name}"):
-                # Build record by preferring any edited value in session_state, otherwise fallback to trade_data
-                record = {
-                    "header": st.session_state.get(f"hdr_{prefix}", trade_data.get("header", "")),
-                    "total_cost": st.session_state.get(f"tc_{prefix}", trade_data.get("Total Cost", "")),
-                    "quantity_price": st.session_state.get(f"qp_{prefix}", trade_data.get("Quantity + Price", "")),
-                    "type": st.session_state.get(f"type_{prefix}", trade_data.get("Type", "")),
-                    "position_effect": st.session_state.get(f"peff_{prefix}", trade_data.get("Position effect", "")),
-                    "time_in_force": st.session_state.get(f"tif_{prefix}", trade_data.get("Time in force", "")),
-                    "submitted": st.session_state.get(f"sub_{prefix}", trade_data.get("Submitted", "")),
-                    "quantity": st.session_state.get(f"qty_{prefix}", trade_data.get("Quantity", "")),
-                    "account": st.session_state.get(f"acct_{prefix}", trade_data.get("Account", "")),
-                    "status": st.session_state.get(f"stat_{prefix}", trade_data.get("Status", "")),
-                    "filled_quantity": st.session_state.get(f"fq_{prefix}", trade_data.get("Filled quantity", "")),
-                    "filled": st.session_state.get(f"filled_{prefix}", trade_data.get("Filled", "")),
-                    "limit_price": st.session_state.get(f"lp_{prefix}", trade_data.get("Limit price", "")),
-                    "est_cost": st.session_state.get(f"ec_{prefix}", trade_data.get("Est cost", "")),
-                    "est_reg_fees": st.session_state.get(f"erf_{prefix}", trade_data.get("Est regulatory fees", "")),
-                    "suggestion": suggestion,
-                    "comment": comment,
-                    "saved_at": datetime.now().isoformat()
-                }
-                insert_trade(record)
-                st.success(f"✅ JSON Trade #{idx + 1} from {uploaded.name} saved to journal.")
+stream_json = st.checkbox(
+    "Import directly (streaming)",
+    key="stream_json",
+    help="Skip the editors: decode each file one trade at a time and save it in batches. "
+         "Use this for very large exports; memory stays flat however many trades a file holds.",
+)
 
+if uploaded_json and stream_json:
+    for uploaded in uploaded_json:
+        # Each upload is imported once per session, not again on every rerun
+        stream_key = f"streamed_{uploaded.name}_{uploaded.size}"
+        if stream_key not in st.session_state:
+            try:
+                with st.spinner(f"Importing {uploaded.name}…"):
+                    uploaded.seek(0)
+                    st.session_state[stream_key] = pipeline.run_stream(uploaded, uploaded.name)
+            except IngestError as e:
+                st.error(f"❌ {e}")
+                continue
+        counts = st.session_state[stream_key]
+        st.success(
+            f"✅ {uploaded.name}: {counts['parsed']} trades read, {counts['inserted']} saved, "
+            f"{counts['skipped']} duplicates skipped, {counts['incomplete']} with missing fields."
+        )
     st.divider()
+elif uploaded_json:
+    render_uploads(pipeline, uploaded_json, "json", "JSON ")
 
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 # SECTION 1b: UPLOAD TXT FILES (using parse_trade_file from formatter.py)
@@ -215,164 +304,227 @@ uploaded_txt = st.file_uploader(
 )
 
 if uploaded_txt:
-    for uploaded in uploaded_txt:
-        # Save uploaded file to a temporary path so parse_trade_file can read it
-        try:
-            tmp_file = tempfile.NamedTemporaryFile(delete=False, suffix=".txt")
-            tmp_file.write(uploaded.read())
-            tmp_file.flush()
-            tmp_file_path = tmp_file.name
-            tmp_file.close()
-        except Exception as e:
-            st.error(f"❌ Could not write {uploaded.name} to temp file: {e}")
-            continue
+    render_uploads(pipeline, uploaded_txt, "txt", "TXT ")
 
-        # Now call parse_trade_file(...) on the temp path
-        trades_list = parse_trade_file(tmp_file_path)
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# SECTION 1c: GRID EDITOR (all uploaded trades, saved in one transaction)
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 
-        if not trades_list:
-            st.warning(f"No valid trade blocks found in {uploaded.name}.")
-            continue
+if editor_mode == "Grid" and grid_rows:
+    from pandas import DataFrame
 
-        expected_keys = {
-            "header", "Total Cost", "Quantity + Price", "Type", "Position effect",
-            "Time in force", "Submitted", "Quantity", "Account", "Status",
-            "Filled quantity", "Filled", "Limit price", "Est cost", "Est regulatory fees"
-        }
+    st.header("1c. Review & Save All Uploaded Trades")
+    edited = st.data_editor(
+        DataFrame(grid_rows),
+        key="grid_editor",
+        hide_index=True,
+        use_container_width=True,
+        disabled=["file", "trade_no"],
+        column_config={
+            "file": "File",
+            "trade_no": "Trade #",
+            **{FIELD_COLUMNS[field]: field_label for field_label, field, _ in EDITOR_FIELDS},
+            "suggestion": "Suggestion",
+            "comment": "Comment",
+        },
+    )
 
-        for idx, trade_data in enumerate(trades_list):
-            st.markdown("---")
-            st.markdown(f"#### File: **{uploaded.name}** | TXT Trade #{idx + 1}")
-
-            missing = expected_keys - set(trade_data.keys())
-            if missing:
-                st.warning(f"TXT Trade #{idx + 1} is missing fields: {', '.join(missing)}")
-
-            col1, col2 = st.columns(2)
-            prefix = f"{uploaded.name}_txt_trade{idx}"
-
-            with col1:
-                hdr = st.text_input("Header", value=trade_data.get("header", ""), key=f"hdr_{prefix}")
-                tc = st.text_input("Total Cost", value=trade_data.get("Total Cost", ""), key=f"tc_{prefix}")
-                qp = st.text_input("Quantity + Price", value=trade_data.get("Quantity + Price", ""), key=f"qp_{prefix}")
-                tp = st.text_input("Type", value=trade_data.get("Type", ""), key=f"type_{prefix}")
-                peff = st.text_input("Position effect", value=trade_data.get("Position effect", ""), key=f"peff_{prefix}")
-                tif = st.text_input("Time in force", value=trade_data.get("Time in force", ""), key=f"tif_{prefix}")
-                subm = st.text_input("Submitted", value=trade_data.get("Submitted", ""), key=f"sub_{prefix}")
-
-            with col2:
-                qty = st.text_input("Quantity", value=trade_data.get("Quantity", ""), key=f"qty_{prefix}")
-                acct = st.text_input("Account", value=trade_data.get("Account", ""), key=f"acct_{prefix}")
-                stat = st.text_input("Status", value=trade_data.get("Status", ""), key=f"stat_{prefix}")
-                fq = st.text_input("Filled quantity", value=trade_data.get("Filled quantity", ""), key=f"fq_{prefix}")
-                filled_time = st.text_input("Filled", value=trade_data.get("Filled", ""), key=f"filled_{prefix}")
-                lp = st.text_input("Limit price", value=trade_data.get("Limit price", ""), key=f"lp_{prefix}")
-                ec = st.text_input("Est cost", value=trade_data.get("Est cost", ""), key=f"ec_{prefix}")
-                erf = st.text_input("Est regulatory fees", value=trade_data.get("Est regulatory fees", ""), key=f"erf_{prefix}")
-
-            suggestion = st.text_area(
-                "Suggestion (e.g., lessons learned, trade improvement ideas)",
-                key=f"sugg_{prefix}"
-            )
-            comment = st.text_area(
-                "Comment (any additional notes you want to store)",
-                key=f"comm_{prefix}"
+    if st.button(f"Save all {len(edited)} trades", type="primary", key="grid_save_all"):
+        saved_at = datetime.now().isoformat()
+        records = [
+            pipeline.to_record(
+                {},
+                overrides={column: row[column] for column in FIELD_COLUMNS.values()},
+                suggestion=row["suggestion"],
+                comment=row["comment"],
+                saved_at=saved_at,
             )
-
-            if st.button(f"Save TXT Trade #{idx + 1} from {uploaded.name}"):
-                # Build record by preferring any edited value; fallback to the parsed TXT data
-                record = {
-                    "header": st.session_state.get(f"hdr_{prefix}", trade_data.get("header", "")),
-                    "total_cost": st.session_state.get(f"tc_{prefix}", trade_data.get("Total Cost", "")),
-                    "quantity_price": st.session_state.get(f"qp_{prefix}", trade_data.get("Quantity + Price", "")),
-                    "type": st.session_state.get(f"type_{prefix}", trade_data.get("Type", "")),
-                    "position_effect": st.session_state.get(f"peff_{prefix}", trade_data.get("Position effect", "")),
-                    "time_in_force": st.session_state.get(f"tif_{prefix}", trade_data.get("Time in force", "")),
-                    "submitted": st.session_state.get(f"sub_{prefix}", trade_data.get("Submitted", "")),
-                    "quantity": st.session_state.get(f"qty_{prefix}", trade_data.get("Quantity", "")),
-                    "account": st.session_state.get(f"acct_{prefix}", trade_data.get("Account", "")),
-                    "status": st.session_state.get(f"stat_{prefix}", trade_data.get("Status", "")),
-                    "filled_quantity": st.session_state.get(f"fq_{prefix}", trade_data.get("Filled quantity", "")),
-                    "filled": st.session_state.get(f"filled_{prefix}", trade_data.get("Filled", "")),
-                    "limit_price": st.session_state.get(f"lp_{prefix}", trade_data.get("Limit price", "")),
-                    "est_cost": st.session_state.get(f"ec_{prefix}", trade_data.get("Est cost", "")),
-                    "est_reg_fees": st.session_state.get(f"erf_{prefix}", trade_data.get("Est regulatory fees", "")),
-                    "suggestion": suggestion,
-                    "comment": comment,
-                    "saved_at": datetime.now().isoformat()
-                }
-                insert_trade(record)
-                st.success(f"✅ TXT Trade #{idx + 1} from {uploaded.name} saved to journal.")
-
-        # (Optional) Clean up the temporary file if you want
-        # os.remove(tmp_file_path)
+            for row in edited.to_dict("records")
+        ]
+        # One batch covering every row, so the whole grid commits (or fails) together
+        result = pipeline.persist(records, batch_size=max(1, len(records)))
+        st.success(
+            f"✅ Saved {result.inserted} trade(s) to the journal in one transaction"
+            f" ({result.skipped} already there, skipped)."
+        )
 
     st.divider()
 
+if uploaded_json or uploaded_txt:
+    with st.expander("Ingestion timings (this run)"):
+        cache = pipeline.cache
+        st.caption(
+            f"Parse cache: {len(cache)} file(s), {cache.total_bytes / 1e6:.1f} MB of "
+            f"{cache.max_bytes / 1e6:.0f} MB · {cache.hits} hit(s), {cache.misses} miss(es) since start"
+        )
+        st.table(
+            [
+                {"Stage": stage, "Items": pipeline.stage_items[stage], "Seconds": round(pipeline.stage_seconds[stage], 4)}
+                for stage in pipeline.stage_seconds
+            ]
+        )
+
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 # SECTION 2: VIEW SAVED TRADES
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 
 st.header("2. Saved Trades")
-trades = fetch_all_trades()
 
-if not trades:
-    st.info("No trades have been saved yet. Upload a JSON or TXT file above and click its Save button.")
-else:
-    from pandas import DataFrame
+# Cursors of the pages visited so far; the last one is the page on screen (None = newest)
+if "saved_cursors" not in st.session_state:
+    st.session_state["saved_cursors"] = [None]
+saved_cursors = st.session_state["saved_cursors"]
+data_version = get_data_version()
+
+def _reset_saved_pages():
+    st.session_state["saved_cursors"] = [None]
+
+# Full-text search over headers and notes, served by the trades_fts index
+search_text = st.text_input(
+    "Search notes",
+    key="saved_search",
+    placeholder="e.g. theta decay, revenge*, earnings",
+    help="Ranked search over headers, suggestions and comments. Every word must match; end a word with * to match it as a prefix.",
+)
 
-    # Show every column for verification
-    df = DataFrame(
-        [
-            {
-                "Saved At": t["saved_at"],
-                "Header": t["header"],
-                "Total Cost": t["total_cost"],
-                "Quantity+Price": t["quantity_price"],
-                "Type": t["type"],
-                "Position effect": t["position_effect"],
-                "Time in force": t["time_in_force"],
-                "Submitted": t["submitted"],
-                "Quantity": t["quantity"],
-                "Account": t["account"],
-                "Status": t["status"],
-                "Filled qty": t["filled_quantity"],
-                "Filled": t["filled"],
-                "Limit price": t["limit_price"],
-                "Est cost": t["est_cost"],
-                "Est reg fees": t["est_reg_fees"],
-                "Suggestion": t["suggestion"],
-                "Comment": t["comment"],
-            }
-            for t in trades
+def _highlighted(text):
+    # Escape the stored text, then turn search_trades' match markers into highlights
+    text = html.escape(text or "")
+    return text.replace(HIGHLIGHT_START, "<mark>").replace(HIGHLIGHT_END, "</mark>")
+
+if search_text.strip():
+    hits = load_search_results(data_version, search_text)
+    if not hits:
+        st.info("No saved trades match this search.")
+    for hit in hits:
+        lines = [
+            f"<b>{_highlighted(hit['header_hit'])}</b> · "
+            f"{html.escape(hit['account'] or '')} · {html.escape(hit['saved_at'] or '')}"
         ]
+        for label, key in (("Suggestion", "suggestion_hit"), ("Comment", "comment_hit")):
+            if hit[key]:
+                lines.append(f"<i>{label}:</i> {_highlighted(hit[key])}")
+        st.markdown("<br>".join(lines), unsafe_allow_html=True)
+    st.divider()
+
+# Each filter is served by its own index (see database.py), so filtering stays a range scan
+filter_account, filter_status, filter_ticker, filter_page_size = st.columns(4)
+with filter_account:
+    accounts = st.multiselect("Account", load_filter_values(data_version, "account"), key="saved_accounts", on_change=_reset_saved_pages)
+with filter_status:
+    statuses = st.multiselect("Status", load_filter_values(data_version, "status"), key="saved_statuses", on_change=_reset_saved_pages)
+with filter_ticker:
+    tickers = st.multiselect("Ticker", load_filter_values(data_version, "underlying"), key="saved_tickers", on_change=_reset_saved_pages)
+with filter_page_size:
+    page_size = st.selectbox(
+        "Trades per page",
+        options=[25, 50, 100, 250, 500],
+        index=2,
+        key="saved_page_size",
+        on_change=_reset_saved_pages,
     )
+
+saved_filters = {}
+if accounts:
+    saved_filters["account"] = accounts
+if statuses:
+    saved_filters["status"] = statuses
+if tickers:
+    saved_filters["underlying"] = tickers
+
+df, next_cursor = load_saved_trades_page(data_version, page_size, saved_cursors[-1], saved_filters)
+
+if df.empty and len(saved_cursors) == 1 and saved_filters:
+    st.info("No saved trades match these filters.")
+elif df.empty and len(saved_cursors) == 1:
+    st.info("No trades have been saved yet. Upload a JSON or TXT file above and click its Save button.")
+else:
     st.dataframe(df, use_container_width=True)
 
+    nav_newer, nav_page, nav_older = st.columns([1, 2, 1])
+    with nav_newer:
+        st.button(
+            "← Newer",
+            disabled=len(saved_cursors) == 1,
+            on_click=saved_cursors.pop,
+            key="saved_newer",
+        )
+    with nav_page:
+        st.caption(f"Page {len(saved_cursors)} · {len(df)} trade(s) shown")
+    with nav_older:
+        st.button(
+            "Older →",
+            disabled=next_cursor is None,
+            on_click=saved_cursors.append,
+            args=(next_cursor,),
+            key="saved_older",
+        )
+
+# Columnar export of the whole journal (typed columns included) for notebooks
+with st.expander("Export for analysis (Parquet)"):
+    st.caption(
+        "Every saved trade as a Parquet dataset partitioned by month and account, "
+        "zipped. Needs pyarrow (`pip install pyarrow`)."
+    )
+    if st.button("Build Parquet export", key="build_parquet"):
+        try:
+            with st.spinner("Exporting…"):
+                st.session_state["parquet_export"] = (data_version, *export_parquet_zip())
+        except ImportError as e:
+            st.error(f"❌ {e}")
+    # Only offer an archive built from the journal as it is now
+    parquet_export = st.session_state.get("parquet_export")
+    if parquet_export and parquet_export[0] == data_version:
+        _, archive, exported_rows = parquet_export
+        st.download_button(
+            f"Download {exported_rows} trade(s) (.zip)",
+            data=archive,
+            file_name=f"trades_parquet_{datetime.now():%Y%m%d}.zip",
+            mime="application/zip",
+            key="download_parquet",
+        )
+
 st.markdown(
     """
     **How it works under the hood:**  
     1. **Uploading JSON files**  
        - You can upload one or more `.json` files (each file can contain a single object or a list of objects).  
+       - Newline-delimited `.ndjson`/`.jsonl` files (one trade object per line) are accepted too.  
        - For each trade in each file, we display all the fields in two columns (pre‐filled from JSON).  
+       - Large files are shown one page at a time (choose the page size and page per file); edits made on one page are kept when you move to another.  
        - You can edit any field, add a “Suggestion” and a “Comment,” then click **Save**.  
        - We assemble a `record` dict by preferring any edited values from `st.session_state`, else we fall back to the original JSON.  
        - That `record` (with all fields) is inserted into `trades.db`.  
+       - With **Import directly (streaming)** ticked, the editors are skipped: the array is decoded one trade at a time and saved in batches, so even very large exports import with flat memory.  
 
     2. **Uploading TXT files**  
        - You can upload one or more `.txt` files following your block format. Each block is separated by at least one blank line.  
-       - We save each uploaded file to a temp path (e.g. via `NamedTemporaryFile`).  
-       - We call `parse_trade_file(path)` (from `formatter.py`), which:  
+       - Each upload is parsed straight from its in-memory buffer (no temp file) by the same parser as `parse_trade_file` (from `formatter.py`), which:  
          - Splits on blank lines to isolate each trade block.  
          - Reads the first line as `"header"`, second as `"Total Cost"`, third as `"Quantity + Price"`.  
-         - Then scans for each label (e.g. `"Type"`, `"Position effect"`, etc.) and pulls its value from the next line.  
+         - Then makes one pass over the remaining lines, and whenever a line is a known label (e.g. `"Type"`, `"Position effect"`, etc.) pulls its value from the next line, in whatever order the labels appear.  
        - Once parsed, each trade gets shown in the same two‐column inputs plus “Suggestion” & “Comment.”  
        - Clicking **Save** builds a `record` that preferentially takes any edited field from `session_state`, or else uses the parsed TXT value.  
        - That `record` is then written to `trades.db`.  
 
-    3. **Viewing saved trades**  
-       - Under “Saved Trades,” you’ll see a DataFrame of every row in `trades.db`, showing each column (header, cost, quantity/price, type, etc.), plus your “Suggestion” and “Comment.”  
+    Parsed uploads (JSON and TXT) are kept in a size-bounded LRU cache keyed by the SHA-256 of the file's bytes, so reruns reuse the parse instead of decoding every file again.  
+
+    3. **Grid mode**  
+       - Switch “Editing mode” to **Grid** to get every trade from every uploaded JSON and TXT file as rows of one editable table.  
+       - **Save all** writes every row through the pipeline's persist stage (`insert_trades`) in one batched transaction instead of one Save click (and rerun) per trade.  
+
+    Every saved trade carries a fingerprint (a hash of header, account, submitted, filled, quantity and quantity/price) under a UNIQUE index, so importing the same export twice skips the trades already in the journal instead of duplicating them.  
+
+    4. **Viewing saved trades**  
+       - Under “Saved Trades,” you’ll see a DataFrame of the rows in `trades.db`, newest first, showing each column (header, cost, quantity/price, type, etc.), plus your “Suggestion” and “Comment.”  
+       - Rows are loaded one page at a time with `fetch_trade_columns` (keyset pagination on `saved_at`, `id`); use **Older →** / **← Newer** to move between pages.  
+       - Only the displayed columns are selected, and the cursor is read in `fetchmany` chunks straight into one list per column, keyed by display label, so the DataFrame is built without a dict per row.  
+       - Option headers are decoded once, at save time, into indexed `side`, `underlying` (Ticker), `strike_cents`, `option_right` and `expiry` columns, so per-ticker and per-expiry views never re-parse headers.  
+       - The Account, Status and Ticker filters each run on their own index; `python database.py` prints the query plan of every dashboard query and flags any full table scan.  
+       - Pages are cached (`st.cache_data`) under a data version that every write bumps, so reruns reuse them until the table changes.  
+       - **Search notes** runs a ranked (bm25) full-text query over headers, suggestions and comments against an FTS5 index that triggers keep in step with `trades`, and shows the matching passages highlighted.  
+       - **Export for analysis (Parquet)** zips the whole table, typed columns included (timestamps as real timestamps), as a Parquet dataset partitioned by month and account; `python export_trades.py <dir>` writes the same dataset from the command line. Rows are read and written in row-group-sized batches, so memory stays bounded on large journals.  
 
-    You now have a single Streamlit app where JSON and TXT files produce identical workflows—TXT files get funneled through your existing `parse_trade_file` logic for normalization, and JSON files skip straight to the UI.  
+    You now have a single Streamlit app where JSON and TXT files produce identical workflows—both run on the shared `IngestionPipeline` in `ingest.py` (decode → normalize → validate → dedupe → persist, each stage timed), with TXT files decoded by your existing `parse_trade_file` logic and JSON files by `json.loads`.  
     """
 )